@@ -0,0 +1,45 @@
+import io
+import streamlit as st
+import matplotlib.pyplot as plt
+from config.settings import FIGURE_CACHE_SIZE, FIGURE_IMAGE_FORMAT, FIGURE_IMAGE_DPI
+from utils.indexes import get_data_version
+from utils.filters import get_filter_key
+
+def get_figure_cache_key(df, batter, filters):
+    """
+    Key for the figures of one batter and filter set on the full dataset,
+    or None when the frame is unversioned and figures should not be cached.
+    """
+    data_version = get_data_version(df)
+    if data_version is None:
+        return None
+    return (data_version, batter, get_filter_key(df, filters))
+
+def render_figure_image(render, image_format=FIGURE_IMAGE_FORMAT, dpi=FIGURE_IMAGE_DPI):
+    """Call render() for a Matplotlib figure and return it as png bytes or an svg string"""
+    fig = render()
+    buffer = io.BytesIO()
+    # Same cropping and resolution st.pyplot uses
+    fig.savefig(buffer, format=image_format, dpi=dpi, bbox_inches="tight")
+    plt.close(fig)
+    image = buffer.getvalue()
+    return image.decode("utf-8") if image_format == "svg" else image
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE)
+def get_cached_figure_image(_render, kind, cache_key, options, image_format, dpi):
+    """Rendered figure per kind, batter, filters, dataset version and display options"""
+    return render_figure_image(_render, image_format, dpi)
+
+def render_cached_figure(render, kind, cache_key=None, options=(), image_format=FIGURE_IMAGE_FORMAT, dpi=FIGURE_IMAGE_DPI):
+    """
+    Display a Matplotlib figure from the rendered-figure cache.
+    render is only called on a cache miss; options holds anything besides
+    cache_key that changes the figure (handedness, sector count, ...).
+    """
+    if cache_key is None:
+        image = render_figure_image(render, image_format, dpi)
+    else:
+        image = get_cached_figure_image(render, kind, cache_key, options, image_format, dpi)
+    # No width argument: at FIGURE_IMAGE_DPI the images are wider than their
+    # column, so they scale down to fill it on every supported Streamlit
+    st.image(image)
@@ -1,41 +1,59 @@
 import streamlit as st
+import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from config.settings import (
     LENGTHS, LENGTHS_DISPLAY, LENGTH_HEIGHTS,
     LINES_RHB, LINES_LHB, LINES_DISPLAY,
-    get_control_color, get_average_color, get_sr_color
+    PITCHMAP_BLANK_COLOR, PITCHMAP_ZERO_COLOR, PITCHMAP_COLORS, PITCHMAP_COLOR_BINS,
+    PITCHMAP_COLOR_CAPS
 )
 
+# Color codes: 0 = blank cell, 1 = zero, 2.. = PITCHMAP_COLORS from red to green
+PITCHMAP_CODE_COLORS = [PITCHMAP_BLANK_COLOR, PITCHMAP_ZERO_COLOR] + PITCHMAP_COLORS
+
+def get_pitchmap_color_codes(values, metric_type):
+    """Bin an array of cell values (NaN for blank cells) into color codes with np.digitize"""
+    codes = 2 + np.digitize(values, PITCHMAP_COLOR_BINS[metric_type])
+    codes[values == 0] = 1
+    codes[np.isnan(values)] = 0
+    return codes
+
+def get_discrete_colorscale(colors):
+    """Plotly colorscale giving integer z value i the i-th color (for zmin=-0.5, zmax=len-0.5)"""
+    scale = []
+    for i, color in enumerate(colors):
+        scale.append([i / len(colors), color])
+        scale.append([(i + 1) / len(colors), color])
+    return scale
+
+def get_grid_line_coordinates(x_edges, y_edges):
+    """x/y coordinates of all cell borders as one None-separated polyline"""
+    x, y = [], []
+    for x_edge in x_edges:
+        x += [x_edge, x_edge, None]
+        y += [y_edges[0], y_edges[-1], None]
+    for y_edge in y_edges:
+        x += [x_edges[0], x_edges[-1], None]
+        y += [y_edge, y_edge, None]
+    return x, y
+
 def create_pitchmap_with_legend(pitchmap_data, metric_type, batter_hand, title):
     """
     Create a pitchmap with legend on the right side using subplots.
+    The cells are a single heatmap trace with per-cell text.
     """
     # Determine line order based on batter hand
     lines = LINES_RHB if batter_hand == "Right" else LINES_LHB
+    line_displays = LINES_DISPLAY if batter_hand == "Right" else LINES_DISPLAY[::-1]
     
-    # Get color function and settings based on metric type
-    if metric_type == 'control':
-        get_color = get_control_color
-        suffix = ""  # No % symbol
-        legend_ranges = ['85-100', '70-85', '55-70', '40-55', '25-40', '0-25']
-    elif metric_type == 'average':
-        get_color = get_average_color
-        suffix = ""
-        legend_ranges = ['60+', '45-60', '30-45', '20-30', '10-20', '0-10']
-    else:  # sr
-        get_color = get_sr_color
-        suffix = ""
-        legend_ranges = ['160+', '130-160', '100-130', '80-100', '50-80', '0-50']
-    
-    legend_colors = [
-        'rgba(100, 200, 80, 0.8)',
-        'rgba(180, 220, 80, 0.8)',
-        'rgba(240, 220, 80, 0.8)',
-        'rgba(250, 170, 80, 0.8)',
-        'rgba(240, 120, 80, 0.8)',
-        'rgba(220, 80, 80, 0.8)'
-    ]
+    # Legend ranges from the top (green) to the bottom (red) bin
+    edges = PITCHMAP_COLOR_BINS[metric_type]
+    cap = PITCHMAP_COLOR_CAPS[metric_type]
+    top_range = f"{edges[-1]}+" if cap is None else f"{edges[-1]}-{cap}"
+    bounds = [0] + edges
+    legend_ranges = [top_range] + [f"{low}-{high}" for low, high in zip(bounds[-2::-1], bounds[:0:-1])]
+    legend_colors = PITCHMAP_COLORS[::-1]
     
     # Create subplot with pitchmap on left (wider) and legend on right (narrower)
     fig = make_subplots(
@@ -44,109 +62,58 @@ def create_pitchmap_with_legend(pitchmap_data, metric_type, batter_hand, title):
         horizontal_spacing=0.02
     )
     
-    # Calculate positions for pitchmap
+    # Heatmap rows run bottom-up, so the last (tallest) length comes first
     total_height = sum(LENGTH_HEIGHTS)
-    y_positions = []
-    current_y = total_height
-    for height in LENGTH_HEIGHTS:
-        current_y -= height
-        y_positions.append(current_y)
-    
-    # Add pitchmap rectangles
-    for length_idx, (length, length_display, height) in enumerate(zip(LENGTHS, LENGTHS_DISPLAY, LENGTH_HEIGHTS)):
-        y_bottom = y_positions[length_idx]
-        y_top = y_bottom + height
-        
-        for line_idx, line in enumerate(lines):
-            x_left = line_idx
-            x_right = line_idx + 1
-            
-            # Get value for this cell
-            value = pitchmap_data.get((length, line), None)
-            
-            # Get color - use neutral color for None/blank values
-            if value is None:
-                color = "rgba(50, 50, 50, 0.6)"
-                display_value = "-"
-            else:
-                color = get_color(value)
-                display_value = f"{value:.1f}{suffix}"
-            
-            # Add rectangle
-            fig.add_shape(
-                type="rect",
-                x0=x_left, y0=y_bottom,
-                x1=x_right, y1=y_top,
-                fillcolor=color,
-                line=dict(color="rgba(255,255,255,0.4)", width=1),
-                row=1, col=1
-            )
-            
-            # Add text annotation - regular font, not bold
-            fig.add_annotation(
-                x=(x_left + x_right) / 2,
-                y=(y_bottom + y_top) / 2,
-                text=display_value,
-                showarrow=False,
-                font=dict(color="white", size=11, family="Arial"),
-                row=1, col=1
-            )
-    
-    # Add length labels on the left
-    for length_idx, (length_display, height) in enumerate(zip(LENGTHS_DISPLAY, LENGTH_HEIGHTS)):
-        y_bottom = y_positions[length_idx]
-        y_center = y_bottom + height / 2
-        fig.add_annotation(
-            x=-0.3,
-            y=y_center,
-            text=length_display,
-            showarrow=False,
-            font=dict(color="white", size=9),
-            xanchor="right",
-            xref="x1",
-            yref="y1"
-        )
-    
-    # Add line labels on top
-    line_displays = LINES_DISPLAY if batter_hand == "Right" else LINES_DISPLAY[::-1]
-    for line_idx, line_display in enumerate(line_displays):
-        fig.add_annotation(
-            x=line_idx + 0.5,
-            y=total_height + 0.3,
-            text=line_display,
-            showarrow=False,
-            font=dict(color="white", size=8),
-            textangle=-45,
-            xref="x1",
-            yref="y1"
-        )
-    
-    # Add legend on the right side (col=2)
+    y_edges = np.concatenate([[0], np.cumsum(LENGTH_HEIGHTS[::-1])])
+    x_edges = np.arange(len(lines) + 1)
+    
+    values = np.array([
+        [np.nan if pitchmap_data.get((length, line)) is None else pitchmap_data[(length, line)] for line in lines]
+        for length in LENGTHS[::-1]
+    ], dtype=float)
+    text = np.where(np.isnan(values), "-", np.char.mod("%.1f", np.nan_to_num(values)))
+    
+    fig.add_trace(go.Heatmap(
+        x=x_edges, y=y_edges,
+        z=get_pitchmap_color_codes(values, metric_type),
+        zmin=-0.5, zmax=len(PITCHMAP_CODE_COLORS) - 0.5,
+        colorscale=get_discrete_colorscale(PITCHMAP_CODE_COLORS),
+        showscale=False,
+        text=text,
+        texttemplate="%{text}",
+        textfont=dict(color="white", size=11, family="Arial"),
+        hoverinfo="skip"
+    ), row=1, col=1)
+    
+    # Cell borders as a single line trace
+    grid_x, grid_y = get_grid_line_coordinates(x_edges, y_edges)
+    fig.add_trace(go.Scatter(
+        x=grid_x, y=grid_y,
+        mode="lines",
+        line=dict(color="rgba(255,255,255,0.4)", width=1),
+        hoverinfo="skip"
+    ), row=1, col=1)
+    
+    # Legend boxes as a one-column heatmap, range text as one text trace
     box_height = total_height / len(legend_ranges)
-    for i, (range_text, color) in enumerate(zip(legend_ranges, legend_colors)):
-        y_pos = total_height - (i + 1) * box_height
-        
-        # Add colored rectangle for legend
-        fig.add_shape(
-            type="rect",
-            x0=0, y0=y_pos,
-            x1=0.4, y1=y_pos + box_height * 0.85,
-            fillcolor=color,
-            line=dict(color="rgba(255,255,255,0.3)", width=1),
-            row=1, col=2
-        )
-        
-        # Add range text
-        fig.add_annotation(
-            x=0.5,
-            y=y_pos + box_height * 0.4,
-            text=range_text,
-            showarrow=False,
-            font=dict(color="white", size=9),
-            xanchor="left",
-            xref="x2",
-            yref="y2"
-        )
+    legend_centers = total_height - (np.arange(len(legend_ranges)) + 0.5) * box_height
+    fig.add_trace(go.Heatmap(
+        x=[0, 0.4], y=legend_centers[::-1],
+        z=np.arange(len(legend_colors))[::-1].reshape(-1, 1),
+        zmin=-0.5, zmax=len(legend_colors) - 0.5,
+        colorscale=get_discrete_colorscale(legend_colors),
+        showscale=False,
+        ygap=6,
+        hoverinfo="skip"
+    ), row=1, col=2)
+    fig.add_trace(go.Scatter(
+        x=[0.5] * len(legend_ranges), y=legend_centers,
+        mode="text",
+        text=legend_ranges,
+        textposition="middle right",
+        textfont=dict(color="white", size=9),
+        hoverinfo="skip"
+    ), row=1, col=2)
     
     # Update layout
     fig.update_layout(
@@ -162,17 +129,25 @@ def create_pitchmap_with_legend(pitchmap_data, metric_type, batter_hand, title):
         showlegend=False
     )
     
-    # Update x and y axes for pitchmap (col 1)
+    # Update x and y axes for pitchmap (col 1); line and length labels are tick labels
     fig.update_xaxes(
         showgrid=False,
-        showticklabels=False,
+        zeroline=False,
+        side="top",
+        tickvals=x_edges[:-1] + 0.5,
+        ticktext=line_displays,
+        tickangle=-45,
+        tickfont=dict(color="white", size=8),
         range=[-1.2, 6.5],
         fixedrange=True,
         row=1, col=1
     )
     fig.update_yaxes(
         showgrid=False,
-        showticklabels=False,
+        zeroline=False,
+        tickvals=(y_edges[:-1] + y_edges[1:]) / 2,
+        ticktext=LENGTHS_DISPLAY[::-1],
+        tickfont=dict(color="white", size=9),
         range=[-0.5, total_height + 1.5],
         fixedrange=True,
         row=1, col=1
@@ -181,6 +156,7 @@ def create_pitchmap_with_legend(pitchmap_data, metric_type, batter_hand, title):
     # Update x and y axes for legend (col 2)
     fig.update_xaxes(
         showgrid=False,
+        zeroline=False,
         showticklabels=False,
         range=[-0.2, 2],
         fixedrange=True,
@@ -188,6 +164,7 @@ def create_pitchmap_with_legend(pitchmap_data, metric_type, batter_hand, title):
     )
     fig.update_yaxes(
         showgrid=False,
+        zeroline=False,
         showticklabels=False,
         range=[-0.5, total_height + 0.5],
         fixedrange=True,
@@ -16,6 +16,6 @@ def render_sidebar(df, page_type="default", key_prefix=""):
         st.markdown("---")
         
         # Filters
-        filters = create_filter_widgets(df, page_type, key_prefix)
+        filters = create_filter_widgets(df, page_type, key_prefix, batter=selected_batter)
         
         return selected_batter, filters
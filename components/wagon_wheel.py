@@ -2,9 +2,13 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+import plotly.graph_objects as go
 import matplotlib.patches as mpatches
 from matplotlib.patches import Wedge
+from matplotlib.collections import LineCollection
 import math
+from config.settings import WAGON_WHEEL_BOUNDARY_MAGNITUDE, SCORING_AREA_RING_MAGNITUDE
+from components.figure_cache import render_cached_figure
 
 def get_adjusted_angle(shot_angle, is_rhb):
     """
@@ -21,6 +25,26 @@ def get_adjusted_angle(shot_angle, is_rhb):
     return matplotlib_angle
 
 
+def get_adjusted_angles_rad(shot_angles):
+    """Vectorized get_adjusted_angle for an array of shot angles, in radians"""
+    return np.deg2rad((90 - np.asarray(shot_angles, dtype=float)) % 360)
+
+
+def get_radial_segments(angles_rad, radii):
+    """Segments from the center out to each (angle, radius), shaped for a LineCollection"""
+    segments = np.zeros((len(angles_rad), 2, 2))
+    segments[:, :, 0] = angles_rad[:, None]
+    segments[:, 1, 1] = radii
+    return segments
+
+
+def add_radial_lines(ax, angles_rad, radii, **kwargs):
+    """Draw all radial lines of one category as a single LineCollection"""
+    if len(angles_rad) > 0:
+        # Projecting caps match the ax.plot lines this replaces
+        ax.add_collection(LineCollection(get_radial_segments(angles_rad, radii), capstyle='projecting', **kwargs))
+
+
 def get_scoring_area_display_angle(shot_angle, is_rhb):
     """
     Get display angle specifically for Scoring Areas wheel.
@@ -48,29 +72,19 @@ def render_boundaries_wheel(df, is_rhb):
     fig, ax = plt.subplots(figsize=(6, 6), subplot_kw={'projection': 'polar'})
     
     # Filter for boundaries
-    fours_df = df[df['runs_scored'] == 4].copy()
-    sixes_df = df[df['runs_scored'] == 6].copy()
+    fours_df = df[df['runs_scored'] == 4]
+    sixes_df = df[df['runs_scored'] == 6]
     
     # Draw the boundary circle
     theta = np.linspace(0, 2*np.pi, 100)
     ax.plot(theta, [1]*100, 'k-', linewidth=2)
     ax.fill(theta, [1]*100, color='#e8f5e9', alpha=0.3)
     
-    # Draw 4s (blue lines)
-    for _, row in fours_df.iterrows():
-        if pd.notna(row.get('shot_angle')):
-            angle_deg = get_adjusted_angle(row['shot_angle'], is_rhb)
-            if angle_deg is not None:
-                angle_rad = np.deg2rad(angle_deg)
-                ax.plot([angle_rad, angle_rad], [0, 1], color='#2196F3', linewidth=1.5, alpha=0.7)
-    
-    # Draw 6s (red lines)
-    for _, row in sixes_df.iterrows():
-        if pd.notna(row.get('shot_angle')):
-            angle_deg = get_adjusted_angle(row['shot_angle'], is_rhb)
-            if angle_deg is not None:
-                angle_rad = np.deg2rad(angle_deg)
-                ax.plot([angle_rad, angle_rad], [0, 1], color='#f44336', linewidth=2, alpha=0.8)
+    # Draw 4s (blue lines) and 6s (red lines), one collection each
+    fours_angles = get_adjusted_angles_rad(fours_df['shot_angle'].dropna())
+    sixes_angles = get_adjusted_angles_rad(sixes_df['shot_angle'].dropna())
+    add_radial_lines(ax, fours_angles, 1.0, color='#2196F3', linewidth=1.5, alpha=0.7)
+    add_radial_lines(ax, sixes_angles, 1.0, color='#f44336', linewidth=2, alpha=0.8)
     
     # Clean up the plot
     ax.set_ylim(0, 1.1)
@@ -96,7 +110,7 @@ def render_caught_out_wheel(df, is_rhb):
     fig, ax = plt.subplots(figsize=(6, 6), subplot_kw={'projection': 'polar'})
     
     # Filter for caught out dismissals
-    caught_df = df[df['dismissalType'].isin(['Caught', 'CaughtSub', 'Caught Out'])].copy()
+    caught_df = df[df['dismissalType'].isin(['Caught', 'CaughtSub', 'Caught Out'])]
     
     # Draw the boundary circle
     theta = np.linspace(0, 2*np.pi, 100)
@@ -104,23 +118,13 @@ def render_caught_out_wheel(df, is_rhb):
     ax.fill(theta, [1]*100, color='#ffebee', alpha=0.3)
     
     # Normalize shot_magnitude: 167+ maps to boundary (1.0)
-    max_magnitude = 167
+    max_magnitude = WAGON_WHEEL_BOUNDARY_MAGNITUDE
     
     # Draw caught out lines
-    for _, row in caught_df.iterrows():
-        if pd.notna(row.get('shot_angle')) and pd.notna(row.get('shot_magnitude')):
-            angle_deg = get_adjusted_angle(row['shot_angle'], is_rhb)
-            if angle_deg is not None:
-                angle_rad = np.deg2rad(angle_deg)
-                
-                # Normalize magnitude
-                magnitude = row['shot_magnitude']
-                if magnitude >= max_magnitude:
-                    normalized_mag = 1.0
-                else:
-                    normalized_mag = magnitude / max_magnitude
-                
-                ax.plot([angle_rad, angle_rad], [0, normalized_mag], color='#d32f2f', linewidth=1.5, alpha=0.7)
+    drawn = caught_df[caught_df['shot_angle'].notna() & caught_df['shot_magnitude'].notna()]
+    caught_angles = get_adjusted_angles_rad(drawn['shot_angle'])
+    normalized_mags = np.minimum(drawn['shot_magnitude'].to_numpy(dtype=float) / max_magnitude, 1.0)
+    add_radial_lines(ax, caught_angles, normalized_mags, color='#d32f2f', linewidth=1.5, alpha=0.7)
     
     # Clean up the plot
     ax.set_ylim(0, 1.1)
@@ -136,11 +140,59 @@ def render_caught_out_wheel(df, is_rhb):
     return fig
 
 
-def render_scoring_areas_wheel(df, is_rhb):
+def get_scoring_area_display_angles_rad(shot_angles, is_rhb):
+    """Vectorized get_scoring_area_display_angle for an array of shot angles, in radians"""
+    base_angles = (90 - np.asarray(shot_angles, dtype=float)) % 360
+    if not is_rhb:
+        base_angles = (base_angles + 90) % 360
+    return np.deg2rad(base_angles)
+
+
+def calculate_scoring_area_stats(df, n_sectors=8, ring_split=False):
+    """
+    Balls, runs and outs per scoring area in a single pass.
+    Sectors split 0-360 into n_sectors equal parts, [start, end) except the last
+    which includes 360. With ring_split each sector is further split into an
+    inner and outer ring at SCORING_AREA_RING_MAGNITUDE (missing magnitudes count
+    as outer). Returns arrays shaped (n_sectors, n_rings).
+    """
+    n_rings = 2 if ring_split else 1
+    angles = df['shot_angle'].to_numpy(dtype=float)
+    runs = df['runs_scored'].to_numpy(dtype=float)
+    
+    if 'is_out' in df.columns:
+        outs = df['is_out'].to_numpy(dtype=float)
+    elif 'dismissalType' in df.columns:
+        outs = (df['dismissalType'].notna() & (df['dismissalType'] != '')).to_numpy(dtype=float)
+    else:
+        outs = np.zeros(len(df))
+    
+    # Sector per ball; 360 folds into the last sector, anything outside 0-360 is dropped
+    edges = np.linspace(0, 360, n_sectors + 1)
+    sectors = np.minimum(np.digitize(angles, edges) - 1, n_sectors - 1)
+    valid = (angles >= 0) & (angles <= 360)
+    
+    codes = sectors * n_rings
+    if ring_split:
+        magnitudes = df['shot_magnitude'].to_numpy(dtype=float)
+        codes = codes + np.digitize(magnitudes, [SCORING_AREA_RING_MAGNITUDE])
+    codes = codes[valid]
+    
+    size = n_sectors * n_rings
+    shape = (n_sectors, n_rings)
+    return {
+        'balls': np.bincount(codes, minlength=size).reshape(shape),
+        'runs': np.bincount(codes, weights=runs[valid], minlength=size).astype(int).reshape(shape),
+        'outs': np.bincount(codes, weights=outs[valid], minlength=size).astype(int).reshape(shape)
+    }
+
+
+def render_scoring_areas_wheel(df, is_rhb, n_sectors=8, ring_split=False):
     """
     Render the Scoring Areas wagon wheel.
-    Divides the ground into 8 equal sectors and shows stats in each.
-    Each sector is 45 degrees, divided at 0, 45, 90, 135, 180, 225, 270, 315.
+    Divides the ground into n_sectors equal sectors and shows stats in each,
+    optionally split into an inner and outer ring by shot distance.
+    With 8 sectors each is 45 degrees, divided at 0, 45, 90, 135, 180, 225, 270, 315.
     
     For LHB, display positions are shifted 90° to correctly align with field positions.
     """
@@ -151,84 +203,54 @@ def render_scoring_areas_wheel(df, is_rhb):
     ax.plot(theta, [1]*100, 'k-', linewidth=2)
     ax.fill(theta, [1]*100, color='#e3f2fd', alpha=0.2)
     
-    # Define 8 sectors (each 45 degrees in cricket angles)
-    # Sectors divided at 0, 45, 90, 135, 180, 225, 270, 315 as per PDF
-    sector_ranges = [
-        (0, 45),
-        (45, 90),
-        (90, 135),
-        (135, 180),
-        (180, 225),
-        (225, 270),
-        (270, 315),
-        (315, 360),
-    ]
+    stats = calculate_scoring_area_stats(df, n_sectors, ring_split)
     
     # Calculate total runs for % of runs calculation
     total_runs_all = df['runs_scored'].sum() if 'runs_scored' in df.columns else 0
     
-    # Process each sector
-    for i, (start_angle, end_angle) in enumerate(sector_ranges):
-        # Filter balls in this sector
-        if end_angle == 360:
-            # Last sector: >= 315 and <= 360
-            sector_df = df[
-                (df['shot_angle'] >= start_angle) & (df['shot_angle'] <= 360)
-            ].copy()
-        else:
-            sector_df = df[
-                (df['shot_angle'] >= start_angle) & (df['shot_angle'] < end_angle)
-            ].copy()
-        
-        # Calculate stats
-        balls = len(sector_df)
-        runs = int(sector_df['runs_scored'].sum()) if balls > 0 else 0
-        
-        # Calculate outs
-        outs = 0
-        if balls > 0:
-            if 'is_out' in sector_df.columns:
-                outs = int(sector_df['is_out'].sum())
-            elif 'dismissalType' in sector_df.columns:
-                outs = int(sector_df['dismissalType'].notna().sum() - (sector_df['dismissalType'] == '').sum())
-        
-        average = runs / outs if outs > 0 else None
-        sr = (runs / balls * 100) if balls > 0 else 0
-        pct_runs = (runs / total_runs_all * 100) if total_runs_all > 0 else 0
-        
-        # Calculate sector center angle in cricket coordinates
-        mid_angle = (start_angle + end_angle) / 2
-        
-        # Draw sector boundaries using the scoring area display function
-        for angle in [start_angle, end_angle]:
-            # Handle 360 as 0
-            draw_angle = angle if angle < 360 else 0
-            adj_angle = get_scoring_area_display_angle(draw_angle, is_rhb)
-            if adj_angle is not None:
-                angle_rad = np.deg2rad(adj_angle)
-                ax.plot([angle_rad, angle_rad], [0, 1], color='#666', linewidth=1, alpha=0.8)
-        
-        # Calculate text position (middle of sector) using scoring area display function
-        adj_mid_angle = get_scoring_area_display_angle(mid_angle, is_rhb)
-        if adj_mid_angle is not None:
-            text_angle_rad = np.deg2rad(adj_mid_angle)
-            text_r = 0.55  # Position text at 55% of radius
+    # Draw sector boundaries using the scoring area display angles
+    edges = np.linspace(0, 360, n_sectors + 1)
+    add_radial_lines(ax, get_scoring_area_display_angles_rad(edges[:-1], is_rhb), 1.0, color='#666', linewidth=1, alpha=0.8)
+    
+    # Ring split circle and text radii (inner/outer ring midpoints, or 55% of radius)
+    if ring_split:
+        ring_r = min(SCORING_AREA_RING_MAGNITUDE / WAGON_WHEEL_BOUNDARY_MAGNITUDE, 1.0)
+        ax.plot(theta, [ring_r]*100, color='#666', linewidth=1, alpha=0.8, linestyle='--')
+        text_radii = [ring_r * 0.7, (ring_r + 1) / 2]
+    else:
+        text_radii = [0.55]
+    
+    # Smaller text as sectors get narrower
+    fontsize = max(10 * 8 / n_sectors, 6)
+    
+    mid_angles_rad = get_scoring_area_display_angles_rad((edges[:-1] + edges[1:]) / 2, is_rhb)
+    for i in range(n_sectors):
+        for ring, text_r in enumerate(text_radii):
+            balls = int(stats['balls'][i, ring])
+            runs = int(stats['runs'][i, ring])
+            outs = int(stats['outs'][i, ring])
+            
+            average = runs / outs if outs > 0 else None
+            sr = (runs / balls * 100) if balls > 0 else 0
+            pct_runs = (runs / total_runs_all * 100) if total_runs_all > 0 else 0
             
             # Format stats text
             avg_str = f"{average:.2f}" if average is not None else "-"
             sr_str = f"{sr:.2f}"
             pct_str = f"{pct_runs:.1f}"
             
-            # Multi-line text for sector stats
-            stats_text = f"{balls} balls\n{runs} runs\nAvg {avg_str}\nSR {sr_str}\n{pct_str}% of runs"
+            # Multi-line text for sector stats, shortened when each sector has two rings
+            if ring_split:
+                stats_text = f"{runs} ({balls})\nSR {sr:.0f}\n{pct_str}%"
+            else:
+                stats_text = f"{balls} balls\n{runs} runs\nAvg {avg_str}\nSR {sr_str}\n{pct_str}% of runs"
             
-            # Add text with font size 10
             ax.annotate(
                 stats_text,
-                xy=(text_angle_rad, text_r),
+                xy=(mid_angles_rad[i], text_r),
                 ha='center',
                 va='center',
-                fontsize=10,
+                fontsize=fontsize,
                 fontweight='normal',
                 color='#333',
                 linespacing=1.2
@@ -245,10 +267,119 @@ def render_scoring_areas_wheel(df, is_rhb):
     return fig
 
 
-def render_wagon_wheels_section(df, is_rhb):
+# Traces of the interactive wagon wheel: (legend name, color, line width)
+INTERACTIVE_RUN_TRACES = {
+    1: ('1s', '#9e9e9e', 1),
+    2: ('2s', '#4caf50', 1),
+    3: ('3s', '#ff9800', 1),
+    4: ('4s', '#2196F3', 1.5),
+    6: ('6s', '#f44336', 2)
+}
+INTERACTIVE_DISMISSAL_TRACE = ('Dismissals', '#000000', 2)
+
+
+def get_interactive_segment_arrays(shots, radii):
+    """
+    r/theta/customdata for one Scatterpolargl trace drawing each shot as a
+    center-to-radius segment, segments separated by NaN gaps.
+    """
+    n = len(shots)
+    r = np.full(n * 3, np.nan, dtype='float32')
+    theta = np.full(n * 3, np.nan, dtype='float32')
+    r[0::3] = 0
+    r[1::3] = radii
+    theta[0::3] = shots['shot_angle'].to_numpy(dtype='float32')
+    theta[1::3] = theta[0::3]
+    
+    # Hover details on both ends of the segment
+    details = np.empty((n * 3, 3), dtype=object)
+    for column, source in enumerate(['bowler', 'over', 'runs_scored']):
+        if source in shots.columns:
+            values = shots[source].astype(object).to_numpy()
+            details[0::3, column] = values
+            details[1::3, column] = values
+    return r, theta, details
+
+
+def create_interactive_wagon_wheel(df, is_rhb):
+    """
+    Plotly (WebGL) wagon wheel with one trace per run value and one for
+    dismissals, so each can be toggled from the legend in the browser.
+    Segment length is shot_magnitude relative to the boundary; boundaries
+    reach the rope as in the static Boundaries wheel, other shots without a
+    shot_magnitude are left out.
+    Angles use the same absolute field direction for RHB and LHB.
+    """
+    fig = go.Figure()
+    
+    # Shots without a magnitude are skipped, as in the Caught Out wheel (boundaries need none)
+    if 'shot_magnitude' in df.columns:
+        radii = np.minimum(df['shot_magnitude'].to_numpy(dtype=float) / WAGON_WHEEL_BOUNDARY_MAGNITUDE, 1.0)
+    else:
+        radii = np.full(len(df), np.nan)
+    has_radius = ~np.isnan(radii)
+    runs = df['runs_scored'].to_numpy()
+    
+    traces = [
+        (runs == value, INTERACTIVE_RUN_TRACES[value], value >= 4)
+        for value in INTERACTIVE_RUN_TRACES
+    ]
+    if 'is_out' in df.columns:
+        traces.append((df['is_out'].to_numpy(dtype=bool), INTERACTIVE_DISMISSAL_TRACE, False))
+    
+    for mask, (name, color, width), to_boundary in traces:
+        if not to_boundary:
+            mask = mask & has_radius
+        if not mask.any():
+            continue
+        shots = df[mask]
+        r, theta, details = get_interactive_segment_arrays(shots, 1.0 if to_boundary else radii[mask])
+        fig.add_trace(go.Scatterpolargl(
+            r=r,
+            theta=theta,
+            mode='lines',
+            line=dict(color=color, width=width),
+            opacity=0.7,
+            name=f"{name} ({len(shots)})",
+            customdata=details,
+            hovertemplate="Bowler: %{customdata[0]}<br>Over: %{customdata[1]}<br>Runs: %{customdata[2]}<extra>" + name + "</extra>"
+        ))
+    
+    fig.update_layout(
+        polar=dict(
+            bgcolor='#e8f5e9',
+            radialaxis=dict(range=[0, 1.05], visible=False),
+            # Clockwise from straight up, matching the static wheels' orientation
+            angularaxis=dict(rotation=90, direction='clockwise', showticklabels=False, ticks='', showgrid=False)
+        ),
+        paper_bgcolor='rgba(0,0,0,0)',
+        legend=dict(orientation='h', y=-0.05),
+        margin=dict(l=20, r=20, t=20, b=20),
+        height=600
+    )
+    
+    return fig
+
+
+def render_static_wheels_row(valid_df, is_rhb, cache_key=None):
+    """Boundaries and Caught Out wheels side by side, as cached Matplotlib images"""
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("#### Boundaries")
+        render_cached_figure(lambda: render_boundaries_wheel(valid_df, is_rhb), 'boundaries_wheel', cache_key, (is_rhb,))
+    
+    with col2:
+        st.markdown("#### Caught Out Dismissals")
+        render_cached_figure(lambda: render_caught_out_wheel(valid_df, is_rhb), 'caught_out_wheel', cache_key, (is_rhb,))
+
+
+def render_wagon_wheels_section(df, is_rhb, n_sectors=8, ring_split=False, cache_key=None, interactive=False):
     """
     Render all three wagon wheels in the specified layout.
     First two horizontally, third one below and larger.
+    cache_key (from get_figure_cache_key) lets repeat views reuse the rendered images.
+    With interactive, the first row is a single Plotly wheel drawn in the browser.
     """
     if df is None or len(df) == 0:
         st.warning("No data available for wagon wheel visualization.")
@@ -260,26 +391,18 @@ def render_wagon_wheels_section(df, is_rhb):
         return
     
     # Filter out rows with missing shot_angle
-    valid_df = df[df['shot_angle'].notna()].copy()
+    valid_df = df[df['shot_angle'].notna()]
     
     if len(valid_df) == 0:
         st.warning("No valid shot angle data for visualization.")
         return
     
-    # First row: Boundaries and Caught Out wheels side by side
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("#### Boundaries")
-        boundaries_fig = render_boundaries_wheel(valid_df, is_rhb)
-        st.pyplot(boundaries_fig)
-        plt.close(boundaries_fig)
-    
-    with col2:
-        st.markdown("#### Caught Out Dismissals")
-        caught_fig = render_caught_out_wheel(valid_df, is_rhb)
-        st.pyplot(caught_fig)
-        plt.close(caught_fig)
+    # First row: one interactive wheel, or Boundaries and Caught Out wheels side by side
+    if interactive:
+        st.markdown("#### All Shots")
+        st.plotly_chart(create_interactive_wagon_wheel(valid_df, is_rhb), use_container_width=True)
+    else:
+        render_static_wheels_row(valid_df, is_rhb, cache_key)
     
     # Second row: Scoring Areas wheel (larger, centered)
     st.markdown("---")
@@ -289,6 +412,7 @@ def render_wagon_wheels_section(df, is_rhb):
     col_left, col_center, col_right = st.columns([1, 2, 1])
     
     with col_center:
-        scoring_fig = render_scoring_areas_wheel(valid_df, is_rhb)
-        st.pyplot(scoring_fig)
-        plt.close(scoring_fig)
\ No newline at end of file
+        render_cached_figure(
+            lambda: render_scoring_areas_wheel(valid_df, is_rhb, n_sectors, ring_split),
+            'scoring_areas_wheel', cache_key, (is_rhb, n_sectors, ring_split)
+        )
\ No newline at end of file
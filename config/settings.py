@@ -35,57 +35,30 @@ LINES_RHB = ["wide outside off", "outside off", "off", "middle", "leg", "down le
 LINES_LHB = ["down leg", "leg", "middle", "off", "outside off", "wide outside off"]
 LINES_DISPLAY = ["Wide Outside Off", "Outside Off", "Off", "Middle", "Leg", "Down Leg"]
 
-# Color scales for pitchmaps (red to green gradient)
-def get_control_color(value):
-    """Color scale for Control % (0-100)"""
-    if value is None or value == 0:
-        return "rgba(180, 60, 60, 0.8)"  # Dark red
-    elif value < 25:
-        return "rgba(220, 80, 80, 0.8)"  # Red
-    elif value < 40:
-        return "rgba(240, 120, 80, 0.8)"  # Orange-red
-    elif value < 55:
-        return "rgba(250, 170, 80, 0.8)"  # Orange
-    elif value < 70:
-        return "rgba(240, 220, 80, 0.8)"  # Yellow
-    elif value < 85:
-        return "rgba(180, 220, 80, 0.8)"  # Yellow-green
-    else:
-        return "rgba(100, 200, 80, 0.8)"  # Green
-
-def get_average_color(value):
-    """Color scale for Average (0-80+)"""
-    if value is None or value == 0:
-        return "rgba(180, 60, 60, 0.8)"
-    elif value < 10:
-        return "rgba(220, 80, 80, 0.8)"
-    elif value < 20:
-        return "rgba(240, 120, 80, 0.8)"
-    elif value < 30:
-        return "rgba(250, 170, 80, 0.8)"
-    elif value < 45:
-        return "rgba(240, 220, 80, 0.8)"
-    elif value < 60:
-        return "rgba(180, 220, 80, 0.8)"
-    else:
-        return "rgba(100, 200, 80, 0.8)"
-
-def get_sr_color(value):
-    """Color scale for Strike Rate (0-200+)"""
-    if value is None or value == 0:
-        return "rgba(180, 60, 60, 0.8)"
-    elif value < 50:
-        return "rgba(220, 80, 80, 0.8)"
-    elif value < 80:
-        return "rgba(240, 120, 80, 0.8)"
-    elif value < 100:
-        return "rgba(250, 170, 80, 0.8)"
-    elif value < 130:
-        return "rgba(240, 220, 80, 0.8)"
-    elif value < 160:
-        return "rgba(180, 220, 80, 0.8)"
-    else:
-        return "rgba(100, 200, 80, 0.8)"
+# Color scales for pitchmaps (red to green gradient).
+# A value below the first bin edge is red, at or above the last edge green;
+# blank cells and exact zeros get their own colors.
+PITCHMAP_BLANK_COLOR = "rgba(50, 50, 50, 0.6)"
+PITCHMAP_ZERO_COLOR = "rgba(180, 60, 60, 0.8)"  # Dark red
+PITCHMAP_COLORS = [
+    "rgba(220, 80, 80, 0.8)",   # Red
+    "rgba(240, 120, 80, 0.8)",  # Orange-red
+    "rgba(250, 170, 80, 0.8)",  # Orange
+    "rgba(240, 220, 80, 0.8)",  # Yellow
+    "rgba(180, 220, 80, 0.8)",  # Yellow-green
+    "rgba(100, 200, 80, 0.8)"   # Green
+]
+PITCHMAP_COLOR_BINS = {
+    'control': [25, 40, 55, 70, 85],   # Control % (0-100)
+    'average': [10, 20, 30, 45, 60],   # Average (0-80+)
+    'sr': [50, 80, 100, 130, 160]      # Strike Rate (0-200+)
+}
+# Upper end of each metric's top legend range; None labels it open-ended ("60+")
+PITCHMAP_COLOR_CAPS = {
+    'control': 100,
+    'average': None,
+    'sr': None
+}
 
 # Effective metrics definitions
 EFFECTIVE_METRICS_NOTE = """
@@ -131,3 +104,91 @@ COLUMN_MAPPINGS = {
     "match_date": "matchDate",
     "fixture_id": "fixtureId"
 }
+
+# Sidebar multiselect filters and the column each one matches against
+MULTISELECT_FILTER_COLUMNS = {
+    "for_team": "battingTeam",
+    "opposition": "bowlingTeam",
+    "competition": "competition",
+    "venue": "ground",
+    "host_country": "country",
+    "bowler_type": "bowlerType",
+    "against_bowler": "bowler",
+    "innings": "inns",
+    "bowler_hand": "bowlerHand",
+    "bowling_angle": "bowlingAngle"
+}
+
+# Max number of filtered slices / baseline match frames kept in memory (LRU)
+FILTER_CACHE_SIZE = 64
+
+# Compact dtypes applied to the deliveries frame at load time.
+# Low-cardinality text columns become categoricals, numeric columns are downcast.
+DTYPE_PLAN = {
+    "batsman": "category",
+    "bowler": "category",
+    "battingTeam": "category",
+    "bowlingTeam": "category",
+    "competition": "category",
+    "ground": "category",
+    "country": "category",
+    "dismissalType": "category",
+    "parsed_length": "category",
+    "parsed_line": "category",
+    "parsed_control": "category",
+    "control": "category",
+    "elevation": "category",
+    "shot_type": "category",
+    "fielding_position": "category",
+    "foot": "category",
+    "variation": "category",
+    "parsed_len.var": "category",
+    "bowlerType": "category",
+    "bowlerHand": "category",
+    "bowlingAngle": "category",
+    "batsmanHand": "category",
+    "over": "int8",
+    "ball": "int8",
+    "inns": "int8",
+    "runs_scored": "int8",
+    "fixtureId": "int32",
+    "shot_angle": "float32",
+    "shot_magnitude": "float32",
+    "team_ball_in_innings": "int16",
+    "batter_ball_in_innings": "int16",
+    "team_runs_before": "int16",
+    "wickets_before": "int8",
+    "wickets_in_hand": "int8",
+    "balls_remaining": "int16",
+    "future_runs": "int16"
+}
+
+# Standard dismissal kinds in table order, and the dismissalType spellings for each
+DISMISSAL_KINDS = ['Lbw', 'Bowled', 'Caught', 'Stumped', 'Caught and Bowled', 'Run Out']
+DISMISSAL_KIND_VARIANTS = {
+    'Lbw': 'Lbw',
+    'LBW': 'Lbw',
+    'Bowled': 'Bowled',
+    'Caught': 'Caught',
+    'CaughtSub': 'Caught',
+    'Caught Out': 'Caught',
+    'Stumped': 'Stumped',
+    'Caught and Bowled': 'Caught and Bowled',
+    'Run Out': 'Run Out'
+}
+
+# Phases of an innings, one per over bucket (1-6, 7-15, 16-20)
+MATCH_PHASES = ['Powerplay (1-6)', 'Middle (7-15)', 'Death (16-20)']
+
+# Wagon wheels: shot_magnitude at (or beyond) the boundary, sector counts offered
+# for the Scoring Areas wheel, and the magnitude splitting its inner/outer ring
+# (roughly the 30-yard circle)
+WAGON_WHEEL_BOUNDARY_MAGNITUDE = 167
+SCORING_AREA_SECTOR_OPTIONS = [8, 12, 16]
+SCORING_AREA_RING_MAGNITUDE = 75
+
+# Rendered Matplotlib figures kept in memory (LRU), and how they are rasterized.
+# Format is "png" or "svg"; DPI only applies to png.
+FIGURE_CACHE_SIZE = 32
+FIGURE_IMAGE_FORMAT = "png"
+FIGURE_IMAGE_DPI = 200
@@ -3,13 +3,12 @@ import pandas as pd
 from components.sidebar import render_sidebar
 from components.footer import render_footer
 from components.tables import render_stats_table
-from utils.filters import apply_filters
-from utils.data_loader import get_batter_hand, get_matches_for_batter_and_filters
-from utils.calculations import calculate_stats_by_group, calculate_basic_stats
+from utils.filters import get_filtered_data
+from utils.data_loader import get_batter_hand, get_baseline_data
+from utils.calculations import calculate_stats_by_groups, get_batter_stats
 
-def render_batter_info(selected_batter, batter_hand, filtered_df):
+def render_batter_info(selected_batter, batter_hand, stats):
     """Render batter info box with raw stats"""
-    stats = calculate_basic_stats(filtered_df)
     
     avg_display = f"{stats['average']:.2f}" if stats['average'] is not None else "-"
     
@@ -59,7 +58,7 @@ def render_ball_type_page(df):
         return
     
     # Apply filters
-    filtered_df = apply_filters(df, selected_batter, filters)
+    filtered_df = get_filtered_data(df, selected_batter, filters)
     
     if filtered_df is None or len(filtered_df) == 0:
         st.warning("No data available for the selected batter and filters.")
@@ -67,19 +66,23 @@ def render_ball_type_page(df):
         return
     
     # Get match IDs for average metrics calculation
-    match_ids = get_matches_for_batter_and_filters(df, selected_batter, filters)
+    match_ids, all_matches_df = get_baseline_data(df, selected_batter, filters)
     
     # Get batter hand for display
     batter_hand = get_batter_hand(df, selected_batter)
     
     # Display batter info with raw stats
-    render_batter_info(selected_batter, batter_hand, filtered_df)
+    render_batter_info(selected_batter, batter_hand, get_batter_stats(df, selected_batter, filters, filtered_df))
     
-    all_matches_df = df[df['fixtureId'].isin(match_ids)]
+    # All three tables from one pass over the batter's and the baseline balls
+    group_columns = ['variation', 'bowlerType']
+    if 'parsed_len.var' in filtered_df.columns:
+        group_columns.append('parsed_len.var')
+    group_stats = calculate_stats_by_groups(filtered_df, all_matches_df, match_ids, group_columns, filter_matches=False)
     
     # Table 1: Generic ball-type/variation wise stats
     st.markdown("---")
-    variation_stats = calculate_stats_by_group(filtered_df, all_matches_df, match_ids, 'variation')
+    variation_stats = group_stats['variation']
     
     if len(variation_stats) > 0:
         variation_stats = variation_stats.rename(columns={'variation': 'Variation'})
@@ -93,7 +96,7 @@ def render_ball_type_page(df):
     
     # Table 2: Detailed ball-type/variation wise stats
     if 'parsed_len.var' in filtered_df.columns:
-        detailed_stats = calculate_stats_by_group(filtered_df, all_matches_df, match_ids, 'parsed_len.var')
+        detailed_stats = group_stats['parsed_len.var']
         
         if len(detailed_stats) > 0:
             detailed_stats = detailed_stats.rename(columns={'parsed_len.var': 'Detailed Ball Type'})
@@ -106,7 +109,7 @@ def render_ball_type_page(df):
     st.markdown("---")
     
     # Table 3: Bowler-type wise stats
-    bowler_type_stats = calculate_stats_by_group(filtered_df, all_matches_df, match_ids, 'bowlerType')
+    bowler_type_stats = group_stats['bowlerType']
     
     if len(bowler_type_stats) > 0:
         bowler_type_stats = bowler_type_stats.rename(columns={'bowlerType': 'Bowler Type'})
@@ -3,13 +3,13 @@ import pandas as pd
 from components.sidebar import render_sidebar
 from components.footer import render_footer
 from components.tables import render_frequency_table
-from utils.filters import apply_filters
+from utils.filters import get_filtered_data
 from utils.data_loader import get_batter_hand, get_matches_for_batter_and_filters
-from utils.calculations import calculate_dismissal_by_group, calculate_basic_stats
+from utils.calculations import calculate_dismissal_by_group, get_batter_stats
+from config.settings import MATCH_PHASES
 
-def render_batter_info(selected_batter, batter_hand, filtered_df):
+def render_batter_info(selected_batter, batter_hand, stats):
     """Render batter info box with raw stats"""
-    stats = calculate_basic_stats(filtered_df)
     
     avg_display = f"{stats['average']:.2f}" if stats['average'] is not None else "-"
     
@@ -59,7 +59,7 @@ def render_dismissals_page(df):
         return
     
     # Apply filters
-    filtered_df = apply_filters(df, selected_batter, filters)
+    filtered_df = get_filtered_data(df, selected_batter, filters)
     
     if filtered_df is None or len(filtered_df) == 0:
         st.warning("No data available for the selected batter and filters.")
@@ -70,7 +70,7 @@ def render_dismissals_page(df):
     batter_hand = get_batter_hand(df, selected_batter)
     
     # Display batter info with raw stats
-    render_batter_info(selected_batter, batter_hand, filtered_df)
+    render_batter_info(selected_batter, batter_hand, get_batter_stats(df, selected_batter, filters, filtered_df))
     
     # Table 1: Ball-type/variation wise dismissals
     variation_dismissals = calculate_dismissal_by_group(filtered_df, 'variation', include_runout=True)
@@ -94,5 +94,42 @@ def render_dismissals_page(df):
     else:
         st.info("No bowler-wise dismissal data available.")
     
+    st.markdown("---")
+    
+    # Table 3: Phase wise dismissals
+    phase_dismissals = calculate_dismissal_by_group(filtered_df, 'phase', include_runout=True)
+    
+    if len(phase_dismissals) > 0:
+        phase_dismissals = phase_dismissals.rename(columns={'phase': 'Phase'})
+        phase_dismissals = phase_dismissals.sort_values('Phase', key=lambda phases: phases.map(MATCH_PHASES.index))
+        render_frequency_table(phase_dismissals, "Phase wise Dismissals")
+    else:
+        st.info("No phase-wise dismissal data available.")
+    
+    st.markdown("---")
+    
+    # Table 4: Line-length wise dismissals
+    line_length_dismissals = calculate_dismissal_by_group(filtered_df, ['parsed_length', 'parsed_line'], include_runout=False)
+    
+    if len(line_length_dismissals) > 0:
+        line_length_dismissals = line_length_dismissals.rename(columns={'parsed_length': 'Length', 'parsed_line': 'Line'})
+        line_length_dismissals['Length'] = line_length_dismissals['Length'].str.title()
+        line_length_dismissals['Line'] = line_length_dismissals['Line'].str.title()
+        render_frequency_table(line_length_dismissals, "Line-length wise Dismissals")
+    else:
+        st.info("No line-length-wise dismissal data available.")
+    
+    st.markdown("---")
+    
+    # Table 5: Shot-type wise dismissals
+    shot_dismissals = calculate_dismissal_by_group(filtered_df, 'shot_type', include_runout=True)
+    
+    if len(shot_dismissals) > 0:
+        shot_dismissals = shot_dismissals.rename(columns={'shot_type': 'Shot Type'})
+        shot_dismissals = shot_dismissals[shot_dismissals['Shot Type'] != '']
+        render_frequency_table(shot_dismissals, "Shot-type wise Dismissals")
+    else:
+        st.info("No shot-type-wise dismissal data available.")
+    
     # Footer
     render_footer()
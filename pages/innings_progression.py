@@ -4,17 +4,18 @@ import plotly.graph_objects as go
 from components.sidebar import render_sidebar
 from components.footer import render_footer
 from components.tables import render_stats_table
-from utils.filters import apply_filters
-from utils.data_loader import get_batter_hand, get_matches_for_batter_and_filters
+from utils.filters import get_filtered_data
+from utils.data_loader import get_batter_hand, get_baseline_data
 from utils.calculations import (
     calculate_progression_data,
-    calculate_stats_by_group,
-    calculate_basic_stats
+    get_progression_sums,
+    calculate_stats_by_groups,
+    calculate_window_over_sums,
+    get_batter_stats
 )
 
-def render_batter_info(selected_batter, batter_hand, filtered_df):
+def render_batter_info(selected_batter, batter_hand, stats):
     """Render batter info box with raw stats"""
-    stats = calculate_basic_stats(filtered_df)
     
     avg_display = f"{stats['average']:.2f}" if stats['average'] is not None else "-"
     
@@ -103,7 +104,7 @@ def render_innings_progression_page(df):
         return
     
     # Apply filters (without overs for this page)
-    filtered_df = apply_filters(df, selected_batter, filters)
+    filtered_df = get_filtered_data(df, selected_batter, filters)
     
     if filtered_df is None or len(filtered_df) == 0:
         st.warning("No data available for the selected batter and filters.")
@@ -111,13 +112,13 @@ def render_innings_progression_page(df):
         return
     
     # Get match IDs for average metrics calculation
-    match_ids = get_matches_for_batter_and_filters(df, selected_batter, filters)
+    match_ids, all_matches_df = get_baseline_data(df, selected_batter, filters)
     
     # Get batter hand for display
     batter_hand = get_batter_hand(df, selected_batter)
     
     # Display batter info with raw stats
-    render_batter_info(selected_batter, batter_hand, filtered_df)
+    render_batter_info(selected_batter, batter_hand, get_batter_stats(df, selected_batter, filters, filtered_df))
     
     # Get rolling window from filters
     rolling_min, rolling_max = filters.get('rolling_window', (0, 20))
@@ -130,8 +131,13 @@ def render_innings_progression_page(df):
         </div>
     """, unsafe_allow_html=True)
     
-    # Calculate progression data
-    progression_df = calculate_progression_data(filtered_df, selected_batter, filters, rolling_min, rolling_max)
+    # Calculate progression data (per-ball sums are cached, the sliders only slice them)
+    progression_df = calculate_progression_data(
+        filtered_df, selected_batter, filters, rolling_min, rolling_max,
+        window=filters.get('smoothing_window', 1),
+        centered=filters.get('smoothing_centered', False),
+        sums=get_progression_sums(df, selected_batter, filters)
+    )
     
     if progression_df is not None and len(progression_df) > 0:
         # Create 2x2 grid of plots
@@ -179,9 +185,16 @@ def render_innings_progression_page(df):
     
     st.markdown("---")
     
+    # Over and ball tables from one pass over the batter's and the baseline balls;
+    # the batter's over sums come from the window cube when no other filter is set
+    over_sums = calculate_window_over_sums(df, selected_batter, filters)
+    group_stats = calculate_stats_by_groups(
+        filtered_df, all_matches_df, match_ids, ['over', 'ball'], filter_matches=False,
+        batter_sums={'over': over_sums} if over_sums is not None else None
+    )
+    
     # Section 2: Over-by-over progression table
-    all_matches_df = df[df['fixtureId'].isin(match_ids)]
-    over_stats = calculate_stats_by_group(filtered_df, all_matches_df, match_ids, 'over')
+    over_stats = group_stats['over']
     
     if len(over_stats) > 0:
         over_stats = over_stats.rename(columns={'over': 'Over'})
@@ -191,7 +204,7 @@ def render_innings_progression_page(df):
     st.markdown("---")
     
     # Section 3: Ball-by-ball progression in an over
-    ball_stats = calculate_stats_by_group(filtered_df, all_matches_df, match_ids, 'ball')
+    ball_stats = group_stats['ball']
     
     if len(ball_stats) > 0:
         ball_stats = ball_stats.rename(columns={'ball': 'Ball'})
@@ -4,19 +4,20 @@ from components.sidebar import render_sidebar
 from components.footer import render_footer
 from components.tables import render_stats_table, render_frequency_table
 from components.pitchmap import render_pitchmaps_section
-from utils.filters import apply_filters
-from utils.data_loader import get_batter_hand, get_matches_for_batter_and_filters
+from utils.filters import get_filtered_data
+from utils.data_loader import get_batter_hand, get_baseline_data
 from utils.calculations import (
+    calculate_line_length_grid,
     calculate_pitchmap_data,
     calculate_stats_by_line_length,
     calculate_control_by_line_length,
+    calculate_elevation_by_line_length,
     calculate_avg_metrics_for_matches,
-    calculate_basic_stats
+    get_batter_stats
 )
 
-def render_batter_info(selected_batter, batter_hand, filtered_df):
+def render_batter_info(selected_batter, batter_hand, stats):
     """Render batter info box with raw stats"""
-    stats = calculate_basic_stats(filtered_df)
     
     avg_display = f"{stats['average']:.2f}" if stats['average'] is not None else "-"
     
@@ -66,7 +67,7 @@ def render_line_length_page(df):
         return
     
     # Apply filters
-    filtered_df = apply_filters(df, selected_batter, filters)
+    filtered_df = get_filtered_data(df, selected_batter, filters)
     
     if filtered_df is None or len(filtered_df) == 0:
         st.warning("No data available for the selected batter and filters.")
@@ -77,18 +78,21 @@ def render_line_length_page(df):
     batter_hand = get_batter_hand(df, selected_batter)
     
     # Get match IDs for average metrics calculation
-    match_ids = get_matches_for_batter_and_filters(df, selected_batter, filters)
+    match_ids, all_matches_df = get_baseline_data(df, selected_batter, filters)
     
     # Display batter info with raw stats
-    render_batter_info(selected_batter, batter_hand, filtered_df)
+    render_batter_info(selected_batter, batter_hand, get_batter_stats(df, selected_batter, filters, filtered_df))
     
     # Section 1: Pitchmaps
     st.markdown("## Pitchmaps")
     
+    # Count every line-length cell once; pitchmaps and tables all read from it
+    grid = calculate_line_length_grid(filtered_df, ['control', 'elevation'])
+    
     # Calculate pitchmap data
-    control_data = calculate_pitchmap_data(filtered_df, 'control')
-    average_data = calculate_pitchmap_data(filtered_df, 'average')
-    sr_data = calculate_pitchmap_data(filtered_df, 'sr')
+    control_data = calculate_pitchmap_data(filtered_df, 'control', grid)
+    average_data = calculate_pitchmap_data(filtered_df, 'average', grid)
+    sr_data = calculate_pitchmap_data(filtered_df, 'sr', grid)
     
     # Render pitchmaps
     render_pitchmaps_section(control_data, average_data, sr_data, batter_hand)
@@ -96,8 +100,7 @@ def render_line_length_page(df):
     st.markdown("---")
     
     # Section 2: Line-length wise stats table
-    all_matches_df = df[df['fixtureId'].isin(match_ids)]
-    stats_df = calculate_stats_by_line_length(filtered_df, all_matches_df, match_ids)
+    stats_df = calculate_stats_by_line_length(filtered_df, all_matches_df, match_ids, grid, filter_matches=False)
     
     if len(stats_df) > 0:
         render_stats_table(stats_df, "Line-length wise Stats", has_effective_metrics=True)
@@ -105,10 +108,18 @@ def render_line_length_page(df):
     st.markdown("---")
     
     # Section 3: Line-length wise shot controls table (with blank instead of 0%)
-    control_freq_df = calculate_control_by_line_length(filtered_df)
+    control_freq_df = calculate_control_by_line_length(filtered_df, grid)
     
     if len(control_freq_df) > 0:
         render_frequency_table(control_freq_df, "Line-length wise Shot Controls", hide_zero_percent=True)
     
+    st.markdown("---")
+    
+    # Section 4: Line-length wise shot elevation table
+    elevation_freq_df = calculate_elevation_by_line_length(filtered_df, grid)
+    
+    if len(elevation_freq_df) > 0:
+        render_frequency_table(elevation_freq_df, "Line-length wise Shot Elevation", hide_zero_percent=True)
+    
     # Footer
     render_footer()
@@ -3,13 +3,12 @@ import pandas as pd
 from components.sidebar import render_sidebar
 from components.footer import render_footer
 from components.tables import render_stats_table
-from utils.filters import apply_filters
-from utils.data_loader import get_batter_hand, get_matches_for_batter_and_filters
-from utils.calculations import calculate_stats_by_group, calculate_basic_stats
+from utils.filters import get_filtered_data
+from utils.data_loader import get_batter_hand, get_baseline_data
+from utils.calculations import calculate_stats_by_group, get_batter_stats
 
-def render_batter_info(selected_batter, batter_hand, filtered_df):
+def render_batter_info(selected_batter, batter_hand, stats):
     """Render batter info box with raw stats"""
-    stats = calculate_basic_stats(filtered_df)
     
     avg_display = f"{stats['average']:.2f}" if stats['average'] is not None else "-"
     
@@ -59,7 +58,7 @@ def render_shot_areas_page(df):
         return
     
     # Apply filters
-    filtered_df = apply_filters(df, selected_batter, filters)
+    filtered_df = get_filtered_data(df, selected_batter, filters)
     
     if filtered_df is None or len(filtered_df) == 0:
         st.warning("No data available for the selected batter and filters.")
@@ -67,17 +66,16 @@ def render_shot_areas_page(df):
         return
     
     # Get match IDs for average metrics calculation
-    match_ids = get_matches_for_batter_and_filters(df, selected_batter, filters)
+    match_ids, all_matches_df = get_baseline_data(df, selected_batter, filters)
     
     # Get batter hand for display
     batter_hand = get_batter_hand(df, selected_batter)
     
     # Display batter info with raw stats
-    render_batter_info(selected_batter, batter_hand, filtered_df)
+    render_batter_info(selected_batter, batter_hand, get_batter_stats(df, selected_batter, filters, filtered_df))
     
     # Calculate fielding position-wise stats
-    all_matches_df = df[df['fixtureId'].isin(match_ids)]
-    stats_df = calculate_stats_by_group(filtered_df, all_matches_df, match_ids, 'fielding_position')
+    stats_df = calculate_stats_by_group(filtered_df, all_matches_df, match_ids, 'fielding_position', filter_matches=False)
     
     if len(stats_df) > 0:
         # Rename column for display
@@ -5,13 +5,13 @@ import matplotlib.pyplot as plt
 from components.sidebar import render_sidebar
 from components.footer import render_footer
 from components.tables import render_effective_metrics_note
-from utils.filters import apply_filters
-from utils.data_loader import get_batter_hand, get_matches_for_batter_and_filters
-from utils.calculations import calculate_basic_stats, calculate_risk_reward_by_shot
+from components.figure_cache import render_cached_figure, get_figure_cache_key
+from utils.filters import get_filtered_data
+from utils.data_loader import get_batter_hand, get_baseline_data
+from utils.calculations import get_batter_stats, calculate_risk_reward_by_shot, calculate_category_performance
 
-def render_batter_info(selected_batter, batter_hand, filtered_df):
+def render_batter_info(selected_batter, batter_hand, stats):
     """Render batter info box with raw stats"""
-    stats = calculate_basic_stats(filtered_df)
     
     avg_display = f"{stats['average']:.2f}" if stats['average'] is not None else "-"
     
@@ -116,75 +116,7 @@ def render_risk_reward_plot(risk_reward_df):
 
 def calculate_shots_analysis(df, all_matches_df, match_ids):
     """Calculate stats by shot type with frequency"""
-    if df is None or len(df) == 0:
-        return pd.DataFrame()
-    
-    # Get unique shot types
-    shot_types = df['shot_type'].dropna().unique()
-    
-    # Calculate overall balls for frequency calculation
-    overall_balls = len(df)
-    
-    results = []
-    for shot in shot_types:
-        if not shot or shot == '':
-            continue
-            
-        shot_df = df[df['shot_type'] == shot]
-        shot_all_df = all_matches_df[all_matches_df['shot_type'] == shot] if all_matches_df is not None else shot_df
-        
-        if len(shot_df) == 0:
-            continue
-        
-        # Calculate basic stats
-        balls = len(shot_df)
-        runs = shot_df['runs_scored'].sum() if 'runs_scored' in shot_df.columns else 0
-        outs = shot_df['is_out'].sum() if 'is_out' in shot_df.columns else 0
-        
-        average = runs / outs if outs > 0 else None
-        sr = (runs / balls * 100) if balls > 0 else 0
-        
-        controlled_balls = shot_df['with_control'].sum() if 'with_control' in shot_df.columns else 0
-        control_pct = (controlled_balls / balls * 100) if balls > 0 else 0
-        
-        dots = shot_df['is_dot'].sum() if 'is_dot' in shot_df.columns else 0
-        dot_pct = (dots / balls * 100) if balls > 0 else 0
-        
-        boundaries = shot_df['is_boundary'].sum() if 'is_boundary' in shot_df.columns else 0
-        boundary_pct = (boundaries / balls * 100) if balls > 0 else 0
-        
-        frequency = (balls / overall_balls * 100) if overall_balls > 0 else 0
-        
-        # Calculate average metrics for this shot type
-        if len(shot_all_df) > 0:
-            all_runs = shot_all_df['runs_scored'].sum() if 'runs_scored' in shot_all_df.columns else 0
-            all_balls = len(shot_all_df)
-            all_controlled = shot_all_df['with_control'].sum() if 'with_control' in shot_all_df.columns else 0
-            
-            avgSR = (all_runs / all_balls * 100) if all_balls > 0 else 0
-            avgControl = (all_controlled / all_balls * 100) if all_balls > 0 else 0
-        else:
-            avgSR = 0
-            avgControl = 0
-        
-        eSR = sr - avgSR
-        eControl = control_pct - avgControl
-        
-        results.append({
-            'Shot Type': shot,
-            'Balls': balls,
-            'Runs': runs,
-            'Average': average,
-            'SR': sr,
-            'eSR': eSR,
-            'Control %': control_pct,
-            'eControl': eControl,
-            'Dot %': dot_pct,
-            'Boundary %': boundary_pct,
-            'Frequency': f"{frequency:.2f}%"
-        })
-    
-    return pd.DataFrame(results)
+    return calculate_category_performance(df, all_matches_df, 'shot_type', 'Shot Type')
 
 def render_shots_analysis_page(df):
     """Render the Shots Analysis page"""
@@ -199,7 +131,7 @@ def render_shots_analysis_page(df):
         return
     
     # Apply filters
-    filtered_df = apply_filters(df, selected_batter, filters)
+    filtered_df = get_filtered_data(df, selected_batter, filters)
     
     if filtered_df is None or len(filtered_df) == 0:
         st.warning("No data available for the selected batter and filters.")
@@ -207,13 +139,13 @@ def render_shots_analysis_page(df):
         return
     
     # Get match IDs for average metrics calculation
-    match_ids = get_matches_for_batter_and_filters(df, selected_batter, filters)
+    match_ids, all_matches_df = get_baseline_data(df, selected_batter, filters)
     
     # Get batter hand for display
     batter_hand = get_batter_hand(df, selected_batter)
     
     # Display batter info with raw stats
-    render_batter_info(selected_batter, batter_hand, filtered_df)
+    render_batter_info(selected_batter, batter_hand, get_batter_stats(df, selected_batter, filters, filtered_df))
     
     st.markdown("---")
     
@@ -239,9 +171,10 @@ def render_shots_analysis_page(df):
         # Center the plot
         col_left, col_center, col_right = st.columns([1, 4, 1])
         with col_center:
-            fig = render_risk_reward_plot(risk_reward_df)
-            st.pyplot(fig)
-            plt.close(fig)
+            render_cached_figure(
+                lambda: render_risk_reward_plot(risk_reward_df),
+                'risk_reward', get_figure_cache_key(df, selected_batter, filters)
+            )
     else:
         st.info("Insufficient data for Risk-Reward analysis.")
     
@@ -249,7 +182,6 @@ def render_shots_analysis_page(df):
     
     # --- BREAKDOWN OF SHOTS TABLE ---
     # Calculate shots analysis
-    all_matches_df = df[df['fixtureId'].isin(match_ids)]
     stats_df = calculate_shots_analysis(filtered_df, all_matches_df, match_ids)
     
     if len(stats_df) > 0:
@@ -269,10 +201,31 @@ def render_shots_analysis_page(df):
     else:
         st.info("No shot analysis data available for the selected filters.")
     
+    st.markdown("---")
+    
+    # --- BREAKDOWN BY SHOT ELEVATION ---
+    elevation_df = calculate_category_performance(filtered_df, all_matches_df, 'elevation', 'Elevation')
+    
+    if len(elevation_df) > 0:
+        st.markdown("### Breakdown of Shot Elevation")
+        display_shots_table(elevation_df, key_prefix="elevation")
+    
+    st.markdown("---")
+    
+    # --- BREAKDOWN BY FIELDING POSITION AND SHOT TYPE ---
+    position_shot_df = calculate_category_performance(
+        filtered_df, all_matches_df,
+        ['fielding_position', 'shot_type'], ['Fielding Position', 'Shot Type']
+    )
+    
+    if len(position_shot_df) > 0:
+        st.markdown("### Breakdown of Shots by Fielding Position")
+        display_shots_table(position_shot_df, key_prefix="position_shot")
+    
     # Footer
     render_footer()
 
-def display_shots_table(df):
+def display_shots_table(df, key_prefix="shots"):
     """Display the shots analysis table with proper formatting"""
     if df is None or len(df) == 0:
         st.info("No data available.")
@@ -284,14 +237,14 @@ def display_shots_table(df):
         sort_column = st.selectbox(
             "Sort by",
             options=["None"] + list(df.columns),
-            key="shots_sort_select",
+            key=f"{key_prefix}_sort_select",
             label_visibility="collapsed"
         )
     with col2:
         sort_order = st.selectbox(
             "Order",
             options=["Ascending", "Descending"],
-            key="shots_sort_order",
+            key=f"{key_prefix}_sort_order",
             label_visibility="collapsed"
         )
     
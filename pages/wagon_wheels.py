@@ -3,13 +3,13 @@ import pandas as pd
 from components.sidebar import render_sidebar
 from components.footer import render_footer
 from components.wagon_wheel import render_wagon_wheels_section
-from utils.filters import apply_filters
+from components.figure_cache import get_figure_cache_key
+from utils.filters import get_filtered_data
 from utils.data_loader import get_batter_hand
-from utils.calculations import calculate_basic_stats
+from utils.calculations import get_batter_stats
 
-def render_batter_info(selected_batter, batter_hand, filtered_df):
+def render_batter_info(selected_batter, batter_hand, stats):
     """Render batter info box with raw stats"""
-    stats = calculate_basic_stats(filtered_df)
     
     avg_display = f"{stats['average']:.2f}" if stats['average'] is not None else "-"
     
@@ -60,7 +60,7 @@ def render_wagon_wheels_page(df):
         return
     
     # Apply filters
-    filtered_df = apply_filters(df, selected_batter, filters)
+    filtered_df = get_filtered_data(df, selected_batter, filters)
     
     if filtered_df is None or len(filtered_df) == 0:
         st.warning("No data available for the selected batter and filters.")
@@ -72,7 +72,7 @@ def render_wagon_wheels_page(df):
     is_rhb = batter_hand == "Right"
     
     # Display batter info with raw stats
-    render_batter_info(selected_batter, batter_hand, filtered_df)
+    render_batter_info(selected_batter, batter_hand, get_batter_stats(df, selected_batter, filters, filtered_df))
     
     st.markdown("---")
     
@@ -80,7 +80,13 @@ def render_wagon_wheels_page(df):
     st.markdown("## Wagon Wheels")
     
     # Render all three wagon wheels
-    render_wagon_wheels_section(filtered_df, is_rhb)
+    render_wagon_wheels_section(
+        filtered_df, is_rhb,
+        n_sectors=filters.get('scoring_sectors', 8),
+        ring_split=filters.get('scoring_ring_split', False),
+        cache_key=get_figure_cache_key(df, selected_batter, filters),
+        interactive=filters.get('wheel_style') == "Interactive"
+    )
     
     # Footer
     render_footer()
\ No newline at end of file
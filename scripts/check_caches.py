@@ -0,0 +1,127 @@
+"""
+Check the cached data paths against the row-wise computations they replace,
+and time both. Run from the repository root:
+
+    python scripts/check_caches.py
+
+Exits with status 1 if any cached result differs.
+"""
+import os
+import sys
+import time
+import logging
+import warnings
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Streamlit caches work outside `streamlit run` but warn about the missing session
+warnings.filterwarnings("ignore")
+logging.disable(logging.WARNING)
+
+from config.settings import MIN_DATE, MAX_DATE, MULTISELECT_FILTER_COLUMNS
+from utils.data_loader import load_data
+from utils.filters import apply_filters, get_filtered_data, get_filter_cache_stats
+from utils.calculations import (
+    calculate_basic_stats, calculate_group_sums, calculate_window_stats, calculate_window_over_sums
+)
+
+def default_filters(**overrides):
+    """Filter dict as create_filter_widgets returns it with nothing selected"""
+    filters = {key: ['All'] for key in MULTISELECT_FILTER_COLUMNS}
+    filters['overs'] = (1, 20)
+    filters['date_range'] = (
+        datetime.strptime(MIN_DATE, "%Y-%m-%d").date(),
+        datetime.strptime(MAX_DATE, "%Y-%m-%d").date()
+    )
+    filters.update(overrides)
+    return filters
+
+def get_filter_sets(df):
+    """A few filter sets covering the default, an over window, a date window and a multiselect"""
+    opposition = sorted(df['bowlingTeam'].dropna().unique().tolist())[:2]
+    return {
+        'default': default_filters(),
+        'overs 7-15': default_filters(overs=(7, 15)),
+        'dates 2021-2023': default_filters(date_range=(datetime(2021, 1, 1).date(), datetime(2023, 12, 31).date())),
+        'opposition': default_filters(opposition=opposition)
+    }
+
+def time_call(function, repeat=20):
+    """Average milliseconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def check_filtered_data(df, batters, filter_sets):
+    """get_filtered_data (cached) against apply_filters"""
+    failures = 0
+    for batter in batters:
+        for name, filters in filter_sets.items():
+            cached = get_filtered_data(df, batter, filters)
+            direct = apply_filters(df, batter, filters)
+            if not cached.equals(direct):
+                failures += 1
+                print(f"  MISMATCH filtered data: {batter} / {name}")
+    
+    batter, filters = batters[0], filter_sets['overs 7-15']
+    cached_ms = time_call(lambda: get_filtered_data(df, batter, filters))
+    direct_ms = time_call(lambda: apply_filters(df, batter, filters))
+    print(f"  filtered data: cached {cached_ms:.2f} ms, apply_filters {direct_ms:.2f} ms")
+    print(f"  filter cache stats: {get_filter_cache_stats()}")
+    return failures
+
+def check_window_cube(df, batters, filter_sets):
+    """Window-cube header stats and over sums against the row-wise computations"""
+    failures = 0
+    for batter in batters:
+        for name, filters in filter_sets.items():
+            filtered_df = apply_filters(df, batter, filters)
+            window_stats = calculate_window_stats(df, batter, filters)
+            window_sums = calculate_window_over_sums(df, batter, filters)
+            
+            # The cube only serves over/date windows; other filters fall back to rows
+            if name == 'opposition':
+                if window_stats is not None or window_sums is not None:
+                    failures += 1
+                    print(f"  UNEXPECTED cube result with a multiselect filter: {batter}")
+                continue
+            
+            if window_stats != calculate_basic_stats(filtered_df):
+                failures += 1
+                print(f"  MISMATCH window stats: {batter} / {name}")
+            
+            row_sums = calculate_group_sums(filtered_df, 'over').sort_index()
+            if window_sums is None or not window_sums.equals(row_sums):
+                failures += 1
+                print(f"  MISMATCH over sums: {batter} / {name}")
+    
+    batter, filters = batters[0], filter_sets['dates 2021-2023']
+    filtered_df = apply_filters(df, batter, filters)
+    cube_ms = time_call(lambda: calculate_window_over_sums(df, batter, filters))
+    rows_ms = time_call(lambda: calculate_group_sums(filtered_df, 'over'))
+    print(f"  over sums: window cube {cube_ms:.2f} ms, groupby {rows_ms:.2f} ms")
+    return failures
+
+def main():
+    df = load_data()
+    if df is None:
+        print("No data loaded")
+        return 1
+    
+    # The three batters with the most deliveries
+    batters = df['batsman'].value_counts().index[:3].tolist()
+    filter_sets = get_filter_sets(df)
+    
+    print("Filtered-slice cache")
+    failures = check_filtered_data(df, batters, filter_sets)
+    
+    print("Window cube")
+    failures += check_window_cube(df, batters, filter_sets)
+    
+    print("FAILED" if failures else "OK")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
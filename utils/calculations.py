@@ -1,5 +1,9 @@
+import streamlit as st
 import pandas as pd
 import numpy as np
+from utils.indexes import get_data_version, get_batter_rows
+from utils.filters import get_active_filter_values, get_filtered_data, get_filter_key
+from config.settings import MULTISELECT_FILTER_COLUMNS, FILTER_CACHE_SIZE, DISMISSAL_KINDS, DISMISSAL_KIND_VARIANTS
 
 def calculate_basic_stats(df):
     """Calculate basic batting statistics"""
@@ -31,19 +35,20 @@ def calculate_basic_stats(df):
         # Count non-null, non-empty dismissal types
         outs = int(df['dismissalType'].notna().sum() - (df['dismissalType'] == '').sum())
     
+    controlled_balls = int(df['with_control'].sum()) if 'with_control' in df.columns else 0
+    dots = int(df['is_dot'].sum()) if 'is_dot' in df.columns else 0
+    boundaries = int(df['is_boundary'].sum()) if 'is_boundary' in df.columns else 0
+    aerials = int(df['is_aerial'].sum()) if 'is_aerial' in df.columns else 0
+    
+    return calculate_stats_from_sums(balls, runs, outs, controlled_balls, dots, boundaries, aerials)
+
+def calculate_stats_from_sums(balls, runs, outs, controlled_balls, dots, boundaries, aerials):
+    """Build the calculate_basic_stats dict from counts"""
     average = runs / outs if outs > 0 else None
     sr = (runs / balls * 100) if balls > 0 else 0
-    
-    controlled_balls = int(df['with_control'].sum()) if 'with_control' in df.columns else 0
     control_pct = (controlled_balls / balls * 100) if balls > 0 else 0
-    
-    dots = int(df['is_dot'].sum()) if 'is_dot' in df.columns else 0
     dot_pct = (dots / balls * 100) if balls > 0 else 0
-    
-    boundaries = int(df['is_boundary'].sum()) if 'is_boundary' in df.columns else 0
     boundary_pct = (boundaries / balls * 100) if balls > 0 else 0
-    
-    aerials = int(df['is_aerial'].sum()) if 'is_aerial' in df.columns else 0
     aerial_pct = (aerials / balls * 100) if balls > 0 else 0
     
     return {
@@ -62,32 +67,341 @@ def calculate_basic_stats(df):
         'controlled_balls': controlled_balls
     }
 
-def calculate_avg_metrics_for_matches(df, match_ids, group_by=None):
+# Per-ball counter columns summed by the group-stats engine
+GROUP_SUM_COLUMNS = {
+    'runs': 'runs_scored',
+    'outs': 'is_out',
+    'controlled_balls': 'with_control',
+    'dots': 'is_dot',
+    'boundaries': 'is_boundary',
+    'aerials': 'is_aerial'
+}
+
+AVG_METRIC_NAMES = ['avgSR', 'avgControl', 'avgAerial']
+
+# Foot values that all mean the batter did not move their feet
+NO_MOVEMENT_LABEL = 'No Effective Movement'
+NO_MOVEMENT_VALUES = ['0.0', '0', 'No Effective Movement', 'NoMovement', 'None', '']
+
+# Proleptic ordinal of 1970-01-01, to line date ordinals up with datetime64 day numbers
+EPOCH_ORDINAL = pd.Timestamp('1970-01-01').toordinal()
+
+def get_stat_counters(df):
+    """Return the per-ball counter columns summed by the group-stats engine"""
+    counters = pd.DataFrame(index=df.index)
+    for name, column in GROUP_SUM_COLUMNS.items():
+        counters[name] = df[column] if column in df.columns else 0
+    
+    # Same fallback as calculate_basic_stats when is_out is missing
+    if 'is_out' not in df.columns and 'dismissalType' in df.columns:
+        counters['outs'] = df['dismissalType'].notna() & (df['dismissalType'] != '')
+    
+    return counters
+
+def get_grouping_key(grouping):
+    """Hashable key for a grouping: the column name, or a tuple of column names"""
+    return grouping if isinstance(grouping, str) else tuple(grouping)
+
+def calculate_grouping_sets(df, grouping_sets):
+    """
+    Count balls, runs, outs, controlled balls, dots, boundaries and aerials
+    for several groupings at once, in the spirit of SQL GROUPING SETS.
+    Each grouping is a column name or a list of columns (composite key).
+    The counters are read from the frame once and every grouping is a
+    bincount over its group codes. Returns {grouping key: sums frame}.
+    """
+    counters = get_stat_counters(df)
+    values = counters.to_numpy(dtype='float64')
+    
+    results = {}
+    for grouping in grouping_sets:
+        codes, labels = factorize_groups(df, grouping)
+        in_group = codes >= 0
+        group_codes = codes[in_group]
+        
+        if isinstance(grouping, str):
+            index = pd.Index(labels[grouping], name=grouping)
+        else:
+            index = pd.MultiIndex.from_frame(labels)
+        
+        sums = pd.DataFrame({'balls': np.bincount(group_codes, minlength=len(labels))}, index=index)
+        for k, name in enumerate(counters.columns):
+            column_sums = np.bincount(group_codes, weights=values[in_group, k], minlength=len(labels))
+            sums[name] = column_sums.astype('int64')
+        results[get_grouping_key(grouping)] = sums
+    
+    return results
+
+def calculate_group_sums(df, group_column):
+    """
+    Count balls, runs, outs, controlled balls, dots, boundaries and aerials
+    for every value of group_column (or combination of a list of columns).
+    """
+    return calculate_grouping_sets(df, [group_column])[get_grouping_key(group_column)]
+
+def calculate_group_rates(sums):
+    """Derive average, strike rate and percentage metrics from group sums"""
+    balls = sums['balls']
+    rates = pd.DataFrame(index=sums.index)
+    rates['average'] = (sums['runs'] / sums['outs']).where(sums['outs'] > 0)
+    rates['sr'] = sums['runs'] / balls * 100
+    rates['control_pct'] = sums['controlled_balls'] / balls * 100
+    rates['dot_pct'] = sums['dots'] / balls * 100
+    rates['boundary_pct'] = sums['boundaries'] / balls * 100
+    rates['aerial_pct'] = sums['aerials'] / balls * 100
+    return rates
+
+def calculate_line_length_grid(df, category_columns=None):
+    """
+    Count every line-length cell in one pass.
+    Each ball gets a single cell id (length code * number of lines + line code)
+    and all counters are built with bincount over those ids. Lengths, lines and
+    categories keep their order of first appearance.
+    """
+    length_codes, lengths = pd.factorize(df['parsed_length'])
+    line_codes, lines = pd.factorize(df['parsed_line'])
+    n_cells = len(lengths) * len(lines)
+    
+    valid = (length_codes >= 0) & (line_codes >= 0)
+    cells = length_codes[valid] * len(lines) + line_codes[valid]
+    
+    counters = get_stat_counters(df)
+    sums = pd.DataFrame({'balls': np.bincount(cells, minlength=n_cells)})
+    for name in counters.columns:
+        weights = counters[name].to_numpy(dtype='float64')[valid]
+        sums[name] = np.bincount(cells, weights=weights, minlength=n_cells).astype('int64')
+    
+    grid = {
+        'lengths': list(lengths),
+        'lines': list(lines),
+        'sums': sums
+    }
+    
+    # Optional per-cell counts of categorical columns (e.g. control, foot, elevation)
+    if isinstance(category_columns, str):
+        category_columns = [category_columns]
+    grid['categories'] = {}
+    for column in category_columns or []:
+        if column not in df.columns:
+            continue
+        category_codes, categories = pd.factorize(df[column])
+        category_codes = category_codes[valid]
+        counted = category_codes >= 0
+        flat = cells[counted] * len(categories) + category_codes[counted]
+        counts = np.bincount(flat, minlength=n_cells * len(categories))
+        grid['categories'][column] = (list(categories), counts.reshape(n_cells, len(categories)))
+    
+    return grid
+
+def iter_line_length_cells(grid):
+    """Yield (cell id, length, line) for every cell with at least one ball"""
+    n_lines = len(grid['lines'])
+    for cell in np.flatnonzero(grid['sums']['balls'].to_numpy()):
+        yield cell, grid['lengths'][cell // n_lines], grid['lines'][cell % n_lines]
+
+def build_window_cube(df, rows):
+    """
+    Build a 2-D prefix-sum cube of the batter's counts over (match date, over).
+    cube[i, j] holds the sums for the first i match dates and overs below j,
+    so any date x over window is four lookups. Returns None when the rows
+    lack over or date values.
+    """
+    if len(rows) == 0 or 'over' not in df.columns or 'matchDate' not in df.columns:
+        return None
+    
+    match_dates = df['matchDate'].iloc[rows]
+    overs = df['over'].iloc[rows]
+    if match_dates.isna().any() or overs.isna().any():
+        return None
+    if (match_dates != match_dates.dt.normalize()).any():
+        return None
+    
+    day_numbers = match_dates.to_numpy().astype('datetime64[D]').astype(np.int64)
+    dates, date_codes = np.unique(day_numbers, return_inverse=True)
+    over_codes = overs.to_numpy().astype(np.int64)
+    n_overs = int(over_codes.max()) + 1
+    
+    # Per-cell sums, then cumulative sums along both axes
+    cells = date_codes * n_overs + over_codes
+    counters = get_stat_counters(df.iloc[rows])
+    columns = ['balls'] + list(counters.columns)
+    cube = np.zeros((len(dates) + 1, n_overs + 1, len(columns)), dtype=np.int64)
+    cube[1:, 1:, 0] = np.bincount(cells, minlength=len(dates) * n_overs).reshape(len(dates), n_overs)
+    for k, name in enumerate(counters.columns, start=1):
+        weights = counters[name].to_numpy(dtype='float64')
+        sums = np.bincount(cells, weights=weights, minlength=len(dates) * n_overs)
+        cube[1:, 1:, k] = sums.reshape(len(dates), n_overs)
+    cube = cube.cumsum(axis=0).cumsum(axis=1)
+    
+    return {'dates': dates, 'columns': columns, 'cube': cube}
+
+@st.cache_resource(max_entries=FILTER_CACHE_SIZE)
+def get_window_cube(_df, data_version, batter):
+    """Window cube for one batter, built on first use per dataset version"""
+    return build_window_cube(_df, get_batter_rows(_df, batter))
+
+def get_batter_window(df, batter, filters):
+    """
+    The batter's window cube and the (date_lo, date_hi, over_lo, over_hi)
+    cube bounds for the over and date window in filters. Returns None when
+    any other filter is active or the cube is unavailable.
+    """
+    data_version = get_data_version(df)
+    if data_version is None or not batter:
+        return None
+    if any(get_active_filter_values(filters, key) is not None for key in MULTISELECT_FILTER_COLUMNS):
+        return None
+    
+    window = get_window_cube(df, data_version, batter)
+    if window is None:
+        return None
+    
+    dates, cube = window['dates'], window['cube']
+    n_dates, n_overs = cube.shape[0] - 1, cube.shape[1] - 1
+    
+    date_lo, date_hi = 0, n_dates
+    if filters.get('date_range'):
+        start_date, end_date = filters['date_range']
+        date_lo = np.searchsorted(dates, pd.Timestamp(start_date).toordinal() - EPOCH_ORDINAL, side='left')
+        date_hi = np.searchsorted(dates, pd.Timestamp(end_date).toordinal() - EPOCH_ORDINAL, side='right')
+    
+    over_lo, over_hi = 0, n_overs
+    if filters.get('overs'):
+        over_min, over_max = filters['overs']
+        over_lo = int(np.clip(over_min, 0, n_overs))
+        over_hi = int(np.clip(over_max + 1, 0, n_overs))
+    
+    return window, (date_lo, date_hi, over_lo, over_hi)
+
+def calculate_window_stats(df, batter, filters):
+    """
+    Calculate the batter's basic stats for the over and date window in
+    filters from the prefix-sum cube. Returns None when any other filter
+    is active or the cube is unavailable.
+    """
+    batter_window = get_batter_window(df, batter, filters)
+    if batter_window is None:
+        return None
+    
+    window, (date_lo, date_hi, over_lo, over_hi) = batter_window
+    cube = window['cube']
+    if date_hi <= date_lo or over_hi <= over_lo:
+        sums = np.zeros(cube.shape[2], dtype=np.int64)
+    else:
+        sums = cube[date_hi, over_hi] - cube[date_lo, over_hi] - cube[date_hi, over_lo] + cube[date_lo, over_lo]
+    
+    return calculate_stats_from_sums(*(int(value) for value in sums))
+
+def calculate_window_over_sums(df, batter, filters):
+    """
+    The batter's calculate_group_sums(..., 'over') frame for the over and
+    date window in filters, read from the prefix-sum cube. Returns None
+    when calculate_window_stats would.
+    """
+    batter_window = get_batter_window(df, batter, filters)
+    if batter_window is None:
+        return None
+    
+    window, (date_lo, date_hi, over_lo, over_hi) = batter_window
+    cube = window['cube']
+    if date_hi <= date_lo or over_hi <= over_lo:
+        return None
+    
+    # Sums over the date window for every prefix of overs, then per-over differences
+    prefix = cube[date_hi, over_lo:over_hi + 1] - cube[date_lo, over_lo:over_hi + 1]
+    per_over = np.diff(prefix, axis=0)
+    faced = per_over[:, 0] > 0
+    
+    overs = pd.Index(np.arange(over_lo, over_hi)[faced].astype(df['over'].dtype), name='over')
+    return pd.DataFrame(per_over[faced], index=overs, columns=window['columns'])
+
+def get_batter_stats(df, batter, filters, filtered_df):
+    """Basic stats for the batter info box, from the window cube when possible"""
+    stats = calculate_window_stats(df, batter, filters)
+    if stats is None:
+        stats = calculate_basic_stats(filtered_df)
+    return stats
+
+def get_group_labels(index):
+    """Return group labels as plain values rather than categoricals"""
+    if isinstance(index.dtype, pd.CategoricalDtype):
+        return index.astype(object)
+    return index
+
+def calculate_category_performance(df, all_matches_df, category_column, label, exclude=('',)):
+    """
+    Calculate batter stats, eSR/eControl against the baseline frame and
+    frequency for every category of a column (or list of columns).
+    Both frames are aggregated with one groupby each; categories whose
+    label is in exclude are dropped. label names the output column(s).
+    """
+    if df is None or len(df) == 0:
+        return pd.DataFrame()
+    
+    columns = [category_column] if isinstance(category_column, str) else list(category_column)
+    labels = [label] if isinstance(label, str) else list(label)
+    
+    sums = calculate_group_sums(df, category_column)
+    rates = calculate_group_rates(sums)
+    
+    # Baseline per category; categories the baseline never saw compare against 0
+    if all_matches_df is None:
+        avg_rates = rates
+    else:
+        avg_rates = calculate_group_rates(calculate_group_sums(all_matches_df, category_column))
+        avg_rates = avg_rates.reindex(sums.index).fillna(0)
+    
+    results = pd.DataFrame(index=range(len(sums)))
+    keep = np.ones(len(sums), dtype=bool)
+    for level, name in enumerate(labels):
+        values = get_group_labels(sums.index.get_level_values(level) if len(columns) > 1 else sums.index)
+        results[name] = np.asarray(values, dtype=object)
+        keep &= ~pd.Series(values).astype(str).str.strip().isin(exclude).to_numpy()
+    
+    results['Balls'] = sums['balls'].to_numpy()
+    results['Runs'] = sums['runs'].to_numpy()
+    results['Average'] = rates['average'].to_numpy()
+    results['SR'] = rates['sr'].to_numpy()
+    results['eSR'] = (rates['sr'] - avg_rates['sr']).to_numpy()
+    results['Control %'] = rates['control_pct'].to_numpy()
+    results['eControl'] = (rates['control_pct'] - avg_rates['control_pct']).to_numpy()
+    results['Dot %'] = rates['dot_pct'].to_numpy()
+    results['Boundary %'] = rates['boundary_pct'].to_numpy()
+    results['Frequency'] = np.char.mod('%.2f%%', sums['balls'].to_numpy() / len(df) * 100)
+    
+    return results[keep].reset_index(drop=True)
+
+def get_match_deliveries(all_matches_df, match_ids, filter_matches=True):
+    """
+    Deliveries of the baseline matches, filtered from all_matches_df by fixture.
+    Frames from get_baseline_data already hold exactly those fixtures, so
+    callers passing one can skip the re-filter with filter_matches=False.
+    """
+    if filter_matches:
+        return all_matches_df[all_matches_df['fixtureId'].isin(match_ids)]
+    return all_matches_df
+
+def calculate_avg_metrics_for_matches(df, match_ids, group_by=None, filter_matches=True):
     """
     Calculate average metrics for all batters in specified matches.
     Used to compute eSR, eControl, eAerial comparisons.
+    Pass filter_matches=False when df is the frame from get_baseline_data
+    (see get_match_deliveries).
     """
     if df is None or len(match_ids) == 0:
         return {'avgSR': 0, 'avgControl': 0, 'avgAerial': 0}
     
-    # Filter to matches
-    match_df = df[df['fixtureId'].isin(match_ids)]
+    match_df = get_match_deliveries(df, match_ids, filter_matches)
     
     if len(match_df) == 0:
         return {'avgSR': 0, 'avgControl': 0, 'avgAerial': 0}
     
     if group_by:
-        # Calculate averages per group
-        result = {}
-        for group_val in match_df[group_by].unique():
-            group_df = match_df[match_df[group_by] == group_val]
-            stats = calculate_basic_stats(group_df)
-            result[group_val] = {
-                'avgSR': stats['sr'],
-                'avgControl': stats['control_pct'],
-                'avgAerial': stats['aerial_pct']
-            }
-        return result
+        # Calculate averages per group in one pass
+        rates = calculate_group_rates(calculate_group_sums(match_df, group_by))
+        avg_metrics = rates[['sr', 'control_pct', 'aerial_pct']]
+        avg_metrics.columns = AVG_METRIC_NAMES
+        return avg_metrics.to_dict('index')
     else:
         stats = calculate_basic_stats(match_df)
         return {
@@ -119,7 +433,64 @@ def calculate_control_percentage(df):
         return (controlled / balls * 100) if balls > 0 else 0
     return 0
 
-def calculate_stats_by_group(df, all_matches_df, match_ids, group_column):
+def calculate_stats_by_groups(df, all_matches_df, match_ids, group_columns, filter_matches=True, batter_sums=None):
+    """
+    Calculate the calculate_stats_by_group table for several groupings
+    (column names or lists of columns) with one pass over each frame.
+    Returns {grouping key: DataFrame}; composite groupings get one label
+    column per grouping column. Pass filter_matches=False when all_matches_df
+    is the frame from get_baseline_data (see get_match_deliveries). batter_sums can supply
+    precomputed batter sums for some groupings (e.g. calculate_window_over_sums).
+    """
+    if df is None or len(df) == 0:
+        return {get_grouping_key(grouping): pd.DataFrame() for grouping in group_columns}
+    
+    # One pass over the batter's balls for the groupings not supplied
+    batter_sums = batter_sums or {}
+    remaining = [grouping for grouping in group_columns if get_grouping_key(grouping) not in batter_sums]
+    sums_by_group = calculate_grouping_sets(df, remaining) if remaining else {}
+    sums_by_group = {
+        get_grouping_key(grouping): batter_sums.get(get_grouping_key(grouping), sums_by_group.get(get_grouping_key(grouping)))
+        for grouping in group_columns
+    }
+    
+    # One pass over the baseline matches
+    avg_sums_by_group = {}
+    if all_matches_df is not None and len(match_ids) > 0:
+        match_df = get_match_deliveries(all_matches_df, match_ids, filter_matches)
+        if len(match_df) > 0:
+            avg_sums_by_group = calculate_grouping_sets(match_df, group_columns)
+    
+    results = {}
+    for key, sums in sums_by_group.items():
+        rates = calculate_group_rates(sums)
+        
+        # Groups the average batter never saw compare against 0
+        avg_metrics = pd.DataFrame(0.0, index=sums.index, columns=AVG_METRIC_NAMES)
+        if key in avg_sums_by_group:
+            avg_rates = calculate_group_rates(avg_sums_by_group[key]).reindex(sums.index).fillna(0)
+            avg_metrics[:] = avg_rates[['sr', 'control_pct', 'aerial_pct']].to_numpy()
+        
+        columns = [key] if isinstance(key, str) else list(key)
+        table = pd.DataFrame({
+            col: get_group_labels(sums.index.get_level_values(col)) for col in columns
+        })
+        table['Balls'] = sums['balls'].to_numpy()
+        table['Runs'] = sums['runs'].to_numpy()
+        table['Average'] = rates['average'].to_numpy()
+        table['SR'] = rates['sr'].to_numpy()
+        table['eSR'] = (rates['sr'] - avg_metrics['avgSR']).to_numpy()
+        table['Control %'] = rates['control_pct'].to_numpy()
+        table['eControl'] = (rates['control_pct'] - avg_metrics['avgControl']).to_numpy()
+        table['Dot %'] = rates['dot_pct'].to_numpy()
+        table['Boundary %'] = rates['boundary_pct'].to_numpy()
+        table['Aerial Shots %'] = rates['aerial_pct'].to_numpy()
+        table['eAerial'] = (rates['aerial_pct'] - avg_metrics['avgAerial']).to_numpy()
+        results[key] = table
+    
+    return results
+
+def calculate_stats_by_group(df, all_matches_df, match_ids, group_column, filter_matches=True):
     """
     Calculate stats grouped by a specific column.
     Returns DataFrame with all stats and effective metrics.
@@ -127,30 +498,31 @@ def calculate_stats_by_group(df, all_matches_df, match_ids, group_column):
     if df is None or len(df) == 0:
         return pd.DataFrame()
     
-    # Get unique groups
-    groups = df[group_column].dropna().unique()
+    return calculate_stats_by_groups(df, all_matches_df, match_ids, [group_column], filter_matches)[group_column]
+
+def calculate_stats_by_line_length(df, all_matches_df, match_ids, grid=None, filter_matches=True):
+    """Calculate stats for each line-length combination"""
+    if df is None or len(df) == 0:
+        return pd.DataFrame()
+    
+    if grid is None:
+        grid = calculate_line_length_grid(df)
+    rates = calculate_group_rates(grid['sums'])
     
-    # Calculate avg metrics per group for comparison
-    avg_metrics_by_group = calculate_avg_metrics_for_matches(all_matches_df, match_ids, group_by=group_column)
+    # Calculate overall avg metrics for comparison
+    avg_metrics = calculate_avg_metrics_for_matches(all_matches_df, match_ids, filter_matches=filter_matches)
     
     results = []
-    for group in groups:
-        group_df = df[df[group_column] == group]
-        stats = calculate_basic_stats(group_df)
-        
-        # Get average metrics for this group
-        if isinstance(avg_metrics_by_group, dict) and group in avg_metrics_by_group:
-            avg_metrics = avg_metrics_by_group[group]
-        else:
-            avg_metrics = avg_metrics_by_group if isinstance(avg_metrics_by_group, dict) else {'avgSR': 0, 'avgControl': 0, 'avgAerial': 0}
-        
+    for cell, length, line in iter_line_length_cells(grid):
+        stats = rates.loc[cell]
         effective = calculate_effective_metrics(stats, avg_metrics)
         
         results.append({
-            group_column: group,
-            'Balls': stats['balls'],
-            'Runs': stats['runs'],
-            'Average': stats['average'],
+            'Length': length.title() if isinstance(length, str) else length,
+            'Line': line.title() if isinstance(line, str) else line,
+            'Balls': grid['sums'].at[cell, 'balls'],
+            'Runs': grid['sums'].at[cell, 'runs'],
+            'Average': None if pd.isna(stats['average']) else stats['average'],
             'SR': stats['sr'],
             'eSR': effective['eSR'],
             'Control %': stats['control_pct'],
@@ -163,209 +535,217 @@ def calculate_stats_by_group(df, all_matches_df, match_ids, group_column):
     
     return pd.DataFrame(results)
 
-def calculate_stats_by_line_length(df, all_matches_df, match_ids):
-    """Calculate stats for each line-length combination"""
-    if df is None or len(df) == 0:
+def calculate_category_by_line_length(df, category_column, grid=None, labels=None, leading_labels=()):
+    """
+    Calculate the share of each category value by line-length combination.
+    labels maps category values to display labels; values sharing a label are
+    merged. leading_labels always come first, even when no ball has them.
+    """
+    if df is None or len(df) == 0 or category_column not in df.columns:
         return pd.DataFrame()
     
-    # Get all unique line-length combinations
-    lines = df['parsed_line'].dropna().unique()
-    lengths = df['parsed_length'].dropna().unique()
-    
-    # Calculate overall avg metrics for comparison
-    avg_metrics = calculate_avg_metrics_for_matches(all_matches_df, match_ids)
-    
-    results = []
-    for length in lengths:
-        for line in lines:
-            combo_df = df[(df['parsed_length'] == length) & (df['parsed_line'] == line)]
-            if len(combo_df) > 0:
-                stats = calculate_basic_stats(combo_df)
-                effective = calculate_effective_metrics(stats, avg_metrics)
-                
-                results.append({
-                    'Length': length.title() if isinstance(length, str) else length,
-                    'Line': line.title() if isinstance(line, str) else line,
-                    'Balls': stats['balls'],
-                    'Runs': stats['runs'],
-                    'Average': stats['average'],
-                    'SR': stats['sr'],
-                    'eSR': effective['eSR'],
-                    'Control %': stats['control_pct'],
-                    'eControl': effective['eControl'],
-                    'Dot %': stats['dot_pct'],
-                    'Boundary %': stats['boundary_pct'],
-                    'Aerial Shots %': stats['aerial_pct'],
-                    'eAerial': effective['eAerial']
-                })
-    
-    return pd.DataFrame(results)
+    if grid is None or category_column not in grid.get('categories', {}):
+        grid = calculate_line_length_grid(df, category_column)
+    categories, counts = grid['categories'][category_column]
+    
+    # Merge categories onto their display labels with a 0/1 matrix product
+    labels = labels or {}
+    category_labels = [labels.get(str(category).strip(), category) for category in categories]
+    label_codes, label_names = pd.factorize(pd.Series(list(leading_labels) + category_labels, dtype=object))
+    merge = np.zeros((len(categories), len(label_names)), dtype=np.int64)
+    merge[np.arange(len(categories)), label_codes[len(leading_labels):]] = 1
+    counts = counts @ merge
+    
+    # Percentages for every non-empty cell, formatted in one go
+    balls = grid['sums']['balls'].to_numpy()
+    cells = np.flatnonzero(balls)
+    shares = np.char.mod('%.2f%%', counts[cells] / balls[cells, None] * 100)
+    
+    n_lines = len(grid['lines'])
+    lengths = [grid['lengths'][cell // n_lines] for cell in cells]
+    lines = [grid['lines'][cell % n_lines] for cell in cells]
+    
+    results = pd.DataFrame({
+        'Length': [length.title() if isinstance(length, str) else length for length in lengths],
+        'Line': [line.title() if isinstance(line, str) else line for line in lines]
+    })
+    for k, label in enumerate(label_names):
+        results[label] = shares[:, k] if len(cells) > 0 else []
+    
+    return results
 
-def calculate_control_by_line_length(df):
+def calculate_control_by_line_length(df, grid=None):
     """Calculate shot control frequency by line-length combination"""
-    if df is None or len(df) == 0 or 'control' not in df.columns:
-        return pd.DataFrame()
-    
-    lines = df['parsed_line'].dropna().unique()
-    lengths = df['parsed_length'].dropna().unique()
-    control_types = df['control'].dropna().unique()
-    
-    results = []
-    for length in lengths:
-        for line in lines:
-            combo_df = df[(df['parsed_length'] == length) & (df['parsed_line'] == line)]
-            if len(combo_df) > 0:
-                row = {
-                    'Length': length.title() if isinstance(length, str) else length,
-                    'Line': line.title() if isinstance(line, str) else line
-                }
-                total_balls = len(combo_df)
-                
-                for control in control_types:
-                    control_count = len(combo_df[combo_df['control'] == control])
-                    row[control] = f"{(control_count / total_balls * 100):.2f}%" if total_balls > 0 else "0.00%"
-                
-                results.append(row)
-    
-    return pd.DataFrame(results)
+    return calculate_category_by_line_length(df, 'control', grid)
 
-def calculate_feet_movement_by_line_length(df):
-    """Calculate feet movement frequency by line-length combination"""
-    if df is None or len(df) == 0 or 'foot' not in df.columns:
-        return pd.DataFrame()
-    
-    lines = df['parsed_line'].dropna().unique()
-    lengths = df['parsed_length'].dropna().unique()
-    foot_types = df['foot'].dropna().unique()
-    
-    results = []
-    for length in lengths:
-        for line in lines:
-            combo_df = df[(df['parsed_length'] == length) & (df['parsed_line'] == line)]
-            if len(combo_df) > 0:
-                row = {
-                    'Length': length.title() if isinstance(length, str) else length,
-                    'Line': line.title() if isinstance(line, str) else line
-                }
-                total_balls = len(combo_df)
-                
-                for foot in foot_types:
-                    foot_count = len(combo_df[combo_df['foot'] == foot])
-                    row[foot] = f"{(foot_count / total_balls * 100):.2f}%" if total_balls > 0 else "0.00%"
-                
-                results.append(row)
-    
-    return pd.DataFrame(results)
+def calculate_elevation_by_line_length(df, grid=None):
+    """Calculate shot elevation frequency by line-length combination"""
+    return calculate_category_by_line_length(df, 'elevation', grid)
+
+def calculate_feet_movement_by_line_length(df, grid=None):
+    """Calculate feet movement frequency by line-length combination, merging the no-movement spellings"""
+    return calculate_category_by_line_length(
+        df, 'foot', grid,
+        labels={value: NO_MOVEMENT_LABEL for value in NO_MOVEMENT_VALUES},
+        leading_labels=[NO_MOVEMENT_LABEL]
+    )
+
+def get_dismissal_kind_codes(df):
+    """Codes into DISMISSAL_KINDS for each ball (-1 when not out or another kind)"""
+    if 'dismissal_kind' in df.columns:
+        return df['dismissal_kind'].cat.codes.to_numpy()
+    kinds = df['dismissalType'].map(DISMISSAL_KIND_VARIANTS)
+    return pd.Categorical(kinds, categories=DISMISSAL_KINDS).codes
+
+def factorize_groups(df, group_columns):
+    """
+    Integer group codes (order of first appearance, -1 for missing values)
+    and a frame of group labels for one column or a list of columns.
+    """
+    if isinstance(group_columns, str):
+        group_columns = [group_columns]
+    
+    combined = np.zeros(len(df), dtype=np.int64)
+    valid = np.ones(len(df), dtype=bool)
+    uniques = []
+    for col in group_columns:
+        codes, col_uniques = pd.factorize(df[col])
+        combined = combined * max(len(col_uniques), 1) + codes
+        valid &= codes >= 0
+        uniques.append(np.asarray(col_uniques))
+    
+    codes = np.full(len(df), -1, dtype=np.int64)
+    codes[valid], first_combined = pd.factorize(combined[valid])
+    
+    # Decode each group's combined code back into per-column labels
+    labels = {}
+    for col, col_uniques in reversed(list(zip(group_columns, uniques))):
+        size = max(len(col_uniques), 1)
+        labels[col] = col_uniques[first_combined % size]
+        first_combined = first_combined // size
+    
+    return codes, pd.DataFrame({col: labels[col] for col in group_columns})
 
 def calculate_dismissal_by_group(df, group_column, include_runout=True):
-    """Calculate dismissal counts by a group column with Balls faced"""
+    """
+    Calculate dismissal counts by a group column (or list of columns) with Balls faced.
+    One bincount over (group code x dismissal kind code) builds the whole table.
+    """
     if df is None or len(df) == 0 or 'dismissalType' not in df.columns:
         return pd.DataFrame()
     
-    groups = df[group_column].dropna().unique()
-    
     # Define standard dismissal types in desired order (excluding Run Out for bowler-wise)
-    if include_runout:
-        standard_dismissals = ['Lbw', 'Bowled', 'Caught', 'Stumped', 'Caught and Bowled', 'Run Out']
-    else:
-        standard_dismissals = ['Lbw', 'Bowled', 'Caught', 'Stumped', 'Caught and Bowled']
-    
-    # Get dismissal types that exist in the data
-    existing_dismissals = [d for d in df['dismissalType'].dropna().unique() if d and d != '']
-    
-    # Map variations to standard names
-    dismissal_mapping = {
-        'Caught': ['Caught', 'CaughtSub', 'Caught Out'],
-        'Lbw': ['Lbw', 'LBW'],
-        'Bowled': ['Bowled'],
-        'Stumped': ['Stumped'],
-        'Caught and Bowled': ['Caught and Bowled'],
-        'Run Out': ['Run Out']
-    }
+    kinds = DISMISSAL_KINDS if include_runout else [kind for kind in DISMISSAL_KINDS if kind != 'Run Out']
     
-    results = []
-    for group in groups:
-        group_df = df[df[group_column] == group]
-        if len(group_df) > 0:
-            row = {group_column: group}
-            total_balls = len(group_df)
-            
-            # Add Balls column first
-            row['Balls'] = total_balls
-            
-            # Count each dismissal type
-            for dismissal_type in standard_dismissals:
-                if not include_runout and dismissal_type == 'Run Out':
-                    continue
-                    
-                # Get all variations of this dismissal type
-                variations = dismissal_mapping.get(dismissal_type, [dismissal_type])
-                
-                # Count dismissals matching any variation
-                count = 0
-                for variation in variations:
-                    count += len(group_df[group_df['dismissalType'] == variation])
-                
-                row[dismissal_type] = count
-            
-            results.append(row)
+    group_codes, results = factorize_groups(df, group_column)
+    kind_codes = get_dismissal_kind_codes(df)
+    n_groups, n_kinds = len(results), len(DISMISSAL_KINDS)
     
-    return pd.DataFrame(results)
+    in_group = group_codes >= 0
+    results['Balls'] = np.bincount(group_codes[in_group], minlength=n_groups)
+    
+    out = in_group & (kind_codes >= 0)
+    counts = np.bincount(group_codes[out] * n_kinds + kind_codes[out], minlength=n_groups * n_kinds)
+    counts = counts.reshape(n_groups, n_kinds)
+    for kind in kinds:
+        results[kind] = counts[:, DISMISSAL_KINDS.index(kind)]
+    
+    return results
+
+# Per-ball counters used by the progression plots
+PROGRESSION_SUM_COLUMNS = {
+    'runs': 'runs_scored',
+    'boundaries': 'is_boundary',
+    'dots': 'is_dot',
+    'aerials': 'is_aerial'
+}
 
-def calculate_progression_data(df, batter, filters, rolling_min, rolling_max):
+def calculate_progression_sums(df):
     """
-    Calculate progression data for innings progression plots.
-    Returns data for Strike Rate, Boundary %, Dot %, Aerial % per rolling window.
+    Sum balls, runs, boundaries, dots and aerials for each ball number of the
+    batter's innings in one bincount pass. Row i of the result is ball number i.
     """
     if df is None or len(df) == 0:
         return None
     
-    # Need to calculate ball number within each innings for the batter
-    batter_df = df.copy()
-    
-    # Sort by fixture and timestamp to get ball order
-    if 'timestamp' in batter_df.columns:
-        batter_df = batter_df.sort_values(['fixtureId', 'inns', 'timestamp'])
+    # Ball number within the batter's innings, precomputed at load
+    if 'batter_ball_in_innings' in df.columns:
+        ball_numbers = df['batter_ball_in_innings'].to_numpy().astype(np.int64)
     else:
-        batter_df = batter_df.sort_values(['fixtureId', 'inns', 'over', 'ball'])
-    
-    # Add ball number within innings
-    batter_df['ball_in_innings'] = batter_df.groupby(['fixtureId', 'inns']).cumcount() + 1
-    
-    results = []
-    for ball_num in range(rolling_min, rolling_max + 1):
-        if ball_num == 0:
-            continue
-        
-        # Get all balls where ball_in_innings == ball_num
-        ball_df = batter_df[batter_df['ball_in_innings'] == ball_num]
-        
-        if len(ball_df) == 0:
-            continue
-        
-        total_balls = len(ball_df)
-        total_runs = ball_df['runs_scored'].sum() if 'runs_scored' in ball_df.columns else 0
-        total_boundaries = ball_df['is_boundary'].sum() if 'is_boundary' in ball_df.columns else 0
-        total_dots = ball_df['is_dot'].sum() if 'is_dot' in ball_df.columns else 0
-        total_aerials = ball_df['is_aerial'].sum() if 'is_aerial' in ball_df.columns else 0
-        
-        sr = (total_runs / total_balls * 100) if total_balls > 0 else 0
-        boundary_pct = (total_boundaries / total_balls * 100) if total_balls > 0 else 0
-        dot_pct = (total_dots / total_balls * 100) if total_balls > 0 else 0
-        aerial_pct = (total_aerials / total_balls * 100) if total_balls > 0 else 0
-        
-        results.append({
-            'Ball': ball_num,
-            'SR': sr,
-            'Boundary %': boundary_pct,
-            'Dot %': dot_pct,
-            'Aerial %': aerial_pct,
-            'Sample Size': total_balls
-        })
+        batter_df = df.sort_values(['fixtureId', 'inns', 'over', 'ball'])
+        ball_numbers = (batter_df.groupby(['fixtureId', 'inns']).cumcount() + 1).to_numpy()
+        df = batter_df
+    
+    n_balls = int(ball_numbers.max()) + 1
+    sums = pd.DataFrame({'balls': np.bincount(ball_numbers, minlength=n_balls)})
+    for name, column in PROGRESSION_SUM_COLUMNS.items():
+        if column in df.columns:
+            weights = pd.to_numeric(df[column], errors='coerce').fillna(0).to_numpy(dtype='float64')
+            sums[name] = np.bincount(ball_numbers, weights=weights, minlength=n_balls)
+        else:
+            sums[name] = 0.0
+    return sums
+
+@st.cache_resource(max_entries=FILTER_CACHE_SIZE)
+def get_cached_progression_sums(_df, _filters, data_version, batter, filter_key):
+    """Progression sums per batter and filter set, so the rolling window slider only slices them"""
+    return calculate_progression_sums(get_filtered_data(_df, batter, _filters))
+
+def get_progression_sums(df, batter, filters):
+    """Cached calculate_progression_sums for the batter's filtered deliveries"""
+    data_version = get_data_version(df)
+    if data_version is None:
+        return calculate_progression_sums(get_filtered_data(df, batter, filters))
+    return get_cached_progression_sums(df, filters, data_version, batter, get_filter_key(df, filters))
+
+def get_window_sums(values, window, centered=False):
+    """
+    Sum values over a window of balls with cumulative-sum differences.
+    Trailing windows cover balls b-window+1..b, centered windows are
+    split around b (the extra ball goes after b for even windows).
+    """
+    totals = np.concatenate([[0], np.cumsum(values)])
+    n = len(values)
+    positions = np.arange(n)
+    if centered:
+        start = positions - (window - 1) // 2
+        stop = positions + window // 2 + 1
+    else:
+        start = positions - window + 1
+        stop = positions + 1
+    return totals[stop.clip(0, n)] - totals[start.clip(0, n)]
+
+def calculate_progression_data(df, batter, filters, rolling_min, rolling_max, window=1, centered=False, sums=None):
+    """
+    Calculate progression data for innings progression plots.
+    Returns data for Strike Rate, Boundary %, Dot %, Aerial % per rolling window.
+    window > 1 smooths each ball number over that many balls.
+    """
+    if sums is None:
+        sums = calculate_progression_sums(df)
+    if sums is None:
+        return None
     
-    return pd.DataFrame(results)
+    # Smooth all counters first, then take ratios of the window sums
+    window = max(int(window), 1)
+    smoothed = sums.apply(lambda values: get_window_sums(values.to_numpy(), window, centered))
+    
+    # Slice to the selected ball numbers that have data
+    ball_numbers = np.arange(len(smoothed))
+    keep = (ball_numbers >= max(rolling_min, 1)) & (ball_numbers <= rolling_max) & (smoothed['balls'].to_numpy() > 0)
+    smoothed = smoothed[keep]
+    balls = smoothed['balls']
+    
+    return pd.DataFrame({
+        'Ball': ball_numbers[keep],
+        'SR': (smoothed['runs'] / balls * 100).to_numpy(),
+        'Boundary %': (smoothed['boundaries'] / balls * 100).to_numpy(),
+        'Dot %': (smoothed['dots'] / balls * 100).to_numpy(),
+        'Aerial %': (smoothed['aerials'] / balls * 100).to_numpy(),
+        'Sample Size': balls.to_numpy().astype(np.int64)
+    })
 
-def calculate_pitchmap_data(df, metric_type):
+def calculate_pitchmap_data(df, metric_type, grid=None):
     """
     Calculate pitchmap data for a specific metric.
     metric_type: 'control', 'average', 'sr'
@@ -376,27 +756,26 @@ def calculate_pitchmap_data(df, metric_type):
     lengths = ['full toss', 'yorker', 'half volley', 'length ball', 'back of a length', 'short', 'bouncer']
     lines = ['wide outside off', 'outside off', 'off', 'middle', 'leg', 'down leg']
     
-    pitchmap_data = {}
+    if grid is None:
+        grid = calculate_line_length_grid(df)
+    rates = calculate_group_rates(grid['sums'])
+    
+    metric_columns = {'control': 'control_pct', 'average': 'average', 'sr': 'sr'}
     
+    # Look up each fixed pitchmap cell in the grid
+    cell_values = {}
+    for cell, length, line in iter_line_length_cells(grid):
+        if metric_type in metric_columns:
+            value = rates.at[cell, metric_columns[metric_type]]
+            value = None if pd.isna(value) else value
+        else:
+            value = 0
+        cell_values[(length, line)] = value
+    
+    pitchmap_data = {}
     for length in lengths:
         for line in lines:
-            combo_df = df[(df['parsed_length'] == length) & (df['parsed_line'] == line)]
-            
-            if len(combo_df) > 0:
-                stats = calculate_basic_stats(combo_df)
-                
-                if metric_type == 'control':
-                    value = stats['control_pct']
-                elif metric_type == 'average':
-                    value = stats['average']
-                elif metric_type == 'sr':
-                    value = stats['sr']
-                else:
-                    value = 0
-                
-                pitchmap_data[(length, line)] = value
-            else:
-                pitchmap_data[(length, line)] = None
+            pitchmap_data[(length, line)] = cell_values.get((length, line))
     
     return pitchmap_data
 
@@ -426,88 +805,150 @@ def get_color_for_effective_metric(value):
     return ""
 
 
-def get_over_bucket(over):
-    """Convert over number to over bucket for state definition"""
-    if over <= 6:
-        return "1-6"
-    elif over <= 15:
-        return "7-15"
-    else:
-        return "16-20"
+# Over buckets used in the run expectancy state, with their upper bounds
+OVER_BUCKETS = ["1-6", "7-15", "16-20"]
+OVER_BUCKET_EDGES = [6, 15]
 
+def get_over_bucket_codes(overs):
+    """Positions in OVER_BUCKETS for an array of over numbers"""
+    return np.digitize(np.asarray(overs), OVER_BUCKET_EDGES, right=True)
 
-def calculate_run_expectancy_table(df):
+
+# Deliveries of one team innings share these keys
+INNINGS_KEYS = ['fixtureId', 'inns']
+
+BALLS_PER_INNINGS = 120
+
+INNINGS_CONTEXT_COLUMNS = [
+    'team_ball_in_innings', 'batter_ball_in_innings', 'team_runs_before',
+    'wickets_before', 'wickets_in_hand', 'balls_remaining', 'future_runs'
+]
+
+def add_innings_context(df):
     """
-    Calculate Run Expectancy (RE) for each state.
-    State = (innings, over_bucket, wickets_in_hand)
-    
-    RE(S) = Expected future runs from state S until innings end.
+    Add in-innings context columns using grouped cumulative operations.
+    Expects deliveries in fixture/innings/over/ball order; the "before" counts
+    exclude the current ball, future_runs includes it.
     """
-    if df is None or len(df) == 0:
-        return {}
+    if not all(col in df.columns for col in INNINGS_KEYS):
+        return df
     
-    # Create a copy and add state columns
-    re_df = df.copy()
+    innings = [df[col] for col in INNINGS_KEYS]
+    if 'runs_scored' in df.columns:
+        runs = pd.to_numeric(df['runs_scored'], errors='coerce').fillna(0)
+    else:
+        runs = pd.Series(0, index=df.index)
+    wickets = df['is_out'].astype(int) if 'is_out' in df.columns else pd.Series(0, index=df.index)
     
-    # Add over bucket
-    re_df['over_bucket'] = re_df['over'].apply(get_over_bucket)
+    # Ball numbers within the team innings and the batter's innings
+    df['team_ball_in_innings'] = df.groupby(INNINGS_KEYS, sort=False).cumcount() + 1
+    if 'batsman' in df.columns:
+        batter_innings = df.groupby(INNINGS_KEYS + ['batsman'], sort=False, observed=True, dropna=False)
+        df['batter_ball_in_innings'] = batter_innings.cumcount() + 1
     
-    # Calculate wickets_in_hand (10 - cumulative wickets)
-    # We need to calculate cumulative wickets within each innings
-    re_df = re_df.sort_values(['fixtureId', 'inns', 'over', 'ball'])
+    # Score and wickets at the start of each ball
+    df['team_runs_before'] = runs.groupby(innings).cumsum() - runs
+    df['wickets_before'] = wickets.groupby(innings).cumsum() - wickets
+    df['wickets_in_hand'] = (10 - df['wickets_before']).clip(1, 10)
     
-    # Calculate cumulative wickets per innings
-    re_df['is_wicket_num'] = re_df['is_out'].astype(int) if 'is_out' in re_df.columns else 0
-    re_df['cum_wickets'] = re_df.groupby(['fixtureId', 'inns'])['is_wicket_num'].cumsum()
-    re_df['wickets_in_hand'] = 10 - re_df['cum_wickets'] + re_df['is_wicket_num']  # Add back current ball wicket
+    # Runs from this ball until the end of the innings
+    df['future_runs'] = runs.groupby(innings).transform('sum') - df['team_runs_before']
     
-    # Cap wickets_in_hand between 1 and 10
-    re_df['wickets_in_hand'] = re_df['wickets_in_hand'].clip(1, 10)
+    if 'over' in df.columns and 'ball' in df.columns:
+        df['balls_remaining'] = (BALLS_PER_INNINGS - (df['over'] - 1) * 6 - (df['ball'] - 1)).clip(lower=0)
     
-    # For each delivery, calculate future runs until innings end
-    # Group by fixture and innings, then calculate cumulative runs from end
-    re_df['runs_scored_num'] = pd.to_numeric(re_df['runs_scored'], errors='coerce').fillna(0)
+    return df
+
+def has_innings_context(df):
+    """Check whether a frame already carries the add_innings_context columns"""
+    return all(col in df.columns for col in ['wickets_in_hand', 'future_runs'])
+
+def calculate_run_expectancy_table(df):
+    """
+    Calculate Run Expectancy (RE) for each state.
+    State = (innings, over_bucket, wickets_in_hand)
     
-    # Calculate total innings runs first
-    innings_totals = re_df.groupby(['fixtureId', 'inns'])['runs_scored_num'].transform('sum')
+    RE(S) = Expected future runs from state S until innings end.
+    """
+    if df is None or len(df) == 0:
+        return {}, pd.DataFrame()
     
-    # Calculate cumulative runs up to this point
-    re_df['cum_runs'] = re_df.groupby(['fixtureId', 'inns'])['runs_scored_num'].cumsum()
+    # State columns come from the load-time innings context stage
+    re_df = df
+    if not has_innings_context(re_df):
+        re_df = add_innings_context(df.sort_values(['fixtureId', 'inns', 'over', 'ball']))
     
-    # Future runs = total - cumulative runs before this ball
-    re_df['future_runs'] = innings_totals - re_df['cum_runs'] + re_df['runs_scored_num']
+    over_bucket = np.array(OVER_BUCKETS)[get_over_bucket_codes(re_df['over'])]
     
-    # Now calculate average future runs for each state
-    re_table = re_df.groupby(['inns', 'over_bucket', 'wickets_in_hand'])['future_runs'].mean().to_dict()
+    # Average future runs for each state
+    state = [re_df['inns'], over_bucket, re_df['wickets_in_hand']]
+    re_table = re_df['future_runs'].groupby(state).mean().to_dict()
     
     return re_table, re_df
 
 
-def calculate_run_value(row, re_table, next_wickets_in_hand):
+def build_run_expectancy_array(re_table):
     """
-    Calculate Run Value for a single delivery.
-    RV = RE(S_next) - RE(S_current)
-    
-    Dismissals are naturally penalized as they reduce wickets_in_hand.
+    Lay the RE table out as a dense array indexed by
+    [innings position, over bucket code, wickets in hand].
+    States missing from the table hold 0, matching re_table.get(state, 0).
     """
-    current_state = (row['inns'], row['over_bucket'], row['wickets_in_hand'])
-    
-    # Next state
-    next_over_bucket = row['over_bucket']  # Simplified: assume same over bucket
-    next_state = (row['inns'], next_over_bucket, next_wickets_in_hand)
+    inns_values = np.array(sorted({state[0] for state in re_table}))
+    re_array = np.zeros((len(inns_values), len(OVER_BUCKETS), 11))
     
-    current_re = re_table.get(current_state, 0)
-    next_re = re_table.get(next_state, 0)
+    for (inns, over_bucket, wickets_in_hand), value in re_table.items():
+        if over_bucket in OVER_BUCKETS and 0 <= wickets_in_hand <= 10:
+            inns_pos = np.searchsorted(inns_values, inns)
+            re_array[inns_pos, OVER_BUCKETS.index(over_bucket), int(wickets_in_hand)] = value
     
-    # Run Value = runs scored + change in run expectancy
-    runs_scored = row['runs_scored_num'] if pd.notna(row.get('runs_scored_num')) else 0
+    return inns_values, re_array
+
+def run_expectancy_to_records(re_table):
+    """Flatten the RE table to JSON-friendly [inns, over_bucket, wickets_in_hand, RE] rows"""
+    return [
+        [int(inns), over_bucket, int(wickets_in_hand), float(value)]
+        for (inns, over_bucket, wickets_in_hand), value in re_table.items()
+    ]
+
+def run_expectancy_from_records(records):
+    """Rebuild the RE table from run_expectancy_to_records output"""
+    return {
+        (inns, over_bucket, wickets_in_hand): value
+        for inns, over_bucket, wickets_in_hand, value in records
+    }
+
+@st.cache_resource
+def get_run_expectancy(_df, data_version, _re_table=None):
+    """
+    Dense RE lookup shared across reruns, built once per dataset version.
+    load_data seeds it with the persisted table; the arrays are read-only.
+    """
+    if _re_table is None:
+        _re_table, _ = calculate_run_expectancy_table(_df)
+    inns_values, re_array = build_run_expectancy_array(_re_table)
+    inns_values.setflags(write=False)
+    re_array.setflags(write=False)
+    return inns_values, re_array
+
+def get_run_expectancy_lookup(df):
+    """Get the (innings values, RE array) lookup for a frame"""
+    data_version = get_data_version(df)
+    if data_version is None:
+        re_table, _ = calculate_run_expectancy_table(df)
+        return build_run_expectancy_array(re_table)
+    return get_run_expectancy(df, data_version)
+
+def lookup_run_expectancy(inns_values, re_array, inns, bucket_codes, wickets_in_hand):
+    """Look up RE for arrays of states; unknown innings give 0"""
+    values = np.zeros(len(inns))
+    if len(inns_values) == 0:
+        return values
     
-    # RV = runs scored + (next_RE - current_RE)
-    # Since we're measuring the value added by this ball
-    rv = runs_scored + (next_re - current_re)
+    inns_pos = np.searchsorted(inns_values, inns).clip(0, len(inns_values) - 1)
+    known = inns_values[inns_pos] == inns
     
-    return rv
-
+    values[known] = re_array[inns_pos[known], bucket_codes[known], wickets_in_hand[known]]
+    return values
 
 def calculate_risk_reward_by_shot(filtered_df, full_df):
     """
@@ -522,68 +963,54 @@ def calculate_risk_reward_by_shot(filtered_df, full_df):
     if filtered_df is None or len(filtered_df) == 0:
         return pd.DataFrame()
     
-    # Calculate Run Expectancy table from full dataset
-    re_table, re_df = calculate_run_expectancy_table(full_df)
+    # Run Expectancy lookup for the full dataset (built once per dataset version)
+    inns_values, re_array = get_run_expectancy_lookup(full_df)
     
-    if not re_table:
+    if re_array.size == 0:
         return pd.DataFrame()
     
     # Prepare filtered data with state columns
-    analysis_df = filtered_df.copy()
-    analysis_df['over_bucket'] = analysis_df['over'].apply(get_over_bucket)
-    
-    # Calculate wickets_in_hand for filtered data
-    analysis_df = analysis_df.sort_values(['fixtureId', 'inns', 'over', 'ball'])
-    analysis_df['is_wicket_num'] = analysis_df['is_out'].astype(int) if 'is_out' in analysis_df.columns else 0
-    analysis_df['cum_wickets'] = analysis_df.groupby(['fixtureId', 'inns'])['is_wicket_num'].cumsum()
-    analysis_df['wickets_in_hand'] = 10 - analysis_df['cum_wickets'] + analysis_df['is_wicket_num']
-    analysis_df['wickets_in_hand'] = analysis_df['wickets_in_hand'].clip(1, 10)
-    analysis_df['runs_scored_num'] = pd.to_numeric(analysis_df['runs_scored'], errors='coerce').fillna(0)
-    
-    # Calculate Run Value for each delivery
-    run_values = []
-    for idx, row in analysis_df.iterrows():
-        # Calculate next wickets_in_hand (after this ball)
-        next_wickets = row['wickets_in_hand'] - row['is_wicket_num']
-        next_wickets = max(1, next_wickets)
-        
-        rv = calculate_run_value(row, re_table, next_wickets)
-        run_values.append(rv)
-    
-    analysis_df['run_value'] = run_values
+    analysis_df = filtered_df.sort_values(['fixtureId', 'inns', 'over', 'ball'])
+    bucket_codes = get_over_bucket_codes(analysis_df['over'])
+    
+    # Wickets in hand come from the full innings, not just the filtered balls
+    if not has_innings_context(analysis_df):
+        analysis_df = add_innings_context(analysis_df)
+    is_wicket = analysis_df['is_out'].astype(int) if 'is_out' in analysis_df.columns else pd.Series(0, index=analysis_df.index)
+    wickets_in_hand = analysis_df['wickets_in_hand'].to_numpy().astype(int)
+    next_wickets = np.maximum(1, wickets_in_hand - is_wicket.to_numpy())
+    runs_scored = pd.to_numeric(analysis_df['runs_scored'], errors='coerce').fillna(0).to_numpy()
+    
+    # Run Value = runs scored + RE(next state) - RE(current state), next state in the same over bucket
+    inns = analysis_df['inns'].to_numpy()
+    current_re = lookup_run_expectancy(inns_values, re_array, inns, bucket_codes, wickets_in_hand)
+    next_re = lookup_run_expectancy(inns_values, re_array, inns, bucket_codes, next_wickets)
+    
+    shot_df = pd.DataFrame({
+        'run_value': runs_scored + (next_re - current_re),
+        'is_wicket_num': is_wicket.to_numpy()
+    })
+    shot_types = analysis_df['shot_type'].to_numpy()
     
     # Aggregate by shot type
-    shot_types = analysis_df['shot_type'].dropna().unique()
-    
-    results = []
     total_balls = len(analysis_df)
+    grouped = shot_df.groupby(shot_types, sort=False)
+    by_shot = grouped.agg(
+        expected_rv=('run_value', 'mean'),
+        wickets=('is_wicket_num', 'sum'),
+        balls=('is_wicket_num', 'size')
+    )
+    by_shot = by_shot[by_shot.index != '']
     
-    for shot in shot_types:
-        if not shot or shot == '':
-            continue
-        
-        shot_df = analysis_df[analysis_df['shot_type'] == shot]
-        
-        if len(shot_df) == 0:
-            continue
-        
-        balls = len(shot_df)
-        
-        # Expected Run Value (Reward)
-        expected_rv = shot_df['run_value'].mean()
-        
-        # Wicket Probability (Risk)
-        wickets = shot_df['is_wicket_num'].sum()
-        wicket_prob = wickets / balls if balls > 0 else 0
-        
-        # Frequency percentage
-        frequency = (balls / total_balls * 100) if total_balls > 0 else 0
+    results = []
+    for shot, row in by_shot.iterrows():
+        balls = int(row['balls'])
         
         results.append({
             'Shot Type': shot,
-            'Expected Run Value': expected_rv,
-            'Wicket Probability': wicket_prob,
-            'Frequency': frequency,
+            'Expected Run Value': row['expected_rv'],
+            'Wicket Probability': row['wickets'] / balls,
+            'Frequency': (balls / total_balls * 100),
             'Balls': balls
         })
     
@@ -1,94 +1,353 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import hashlib
+import json
+import logging
+import time
+import glob
 import os
+import tempfile
+from utils.indexes import (
+    get_batter_index, get_batter_rows, get_bitmap_index, get_fixture_index,
+    get_batter_fixtures, get_fixture_rows, get_data_version, test_bitmap,
+    build_dimension_dictionary, get_dimension_dictionary, get_filter_options,
+    get_batter_value_counts_index
+)
+from utils.filters import get_filter_bitmap, get_filter_key, FILTER_CACHE_STATS
+from utils.calculations import (
+    add_innings_context, calculate_run_expectancy_table, get_run_expectancy, get_over_bucket_codes,
+    run_expectancy_to_records, run_expectancy_from_records
+)
+from config.settings import DTYPE_PLAN, FILTER_CACHE_SIZE, DISMISSAL_KINDS, DISMISSAL_KIND_VARIANTS, MATCH_PHASES
 
-@st.cache_data
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+SNAPSHOT_DIR = os.path.join(DATA_DIR, "cache")
+SNAPSHOT_FILE_MODE = 0o644
+
+# Filters that define the "average batter" match set
+MATCH_FILTER_KEYS = ['for_team', 'opposition', 'competition', 'venue', 'host_country', 'innings']
+
+# Bump whenever preprocess_data changes its output so old snapshots are rebuilt
+PREPROCESS_VERSION = 6
+
+@st.cache_resource
 def load_data():
-    """Load and preprocess the cricket data"""
-    data_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "wt20.csv")
+    """
+    Load and preprocess the cricket data.
+    The frame is shared across sessions and reruns, so treat it as read-only.
+    """
+    data_path = os.path.join(DATA_DIR, "wt20.csv")
     
     if not os.path.exists(data_path):
         st.error(f"Data file not found at: {data_path}")
         st.info("Please place your wt20.csv file in the 'data' folder.")
         return None
     
-    df = pd.read_csv(data_path)
+    # Reuse the preprocessed snapshot if the CSV and preprocessing are unchanged
+    data_version = f"{get_file_hash(data_path)[:16]}_v{PREPROCESS_VERSION}"
+    snapshot_path = get_snapshot_path(data_version)
+    df = read_snapshot(snapshot_path)
+    
+    if df is None:
+        df = pd.read_csv(data_path)
+        
+        # Preprocess data
+        df = preprocess_data(df)
+        
+        # Shrink text columns to categoricals and downcast numerics
+        before_usage = df.memory_usage(deep=True) if logger.isEnabledFor(logging.DEBUG) else None
+        df = apply_dtype_plan(df)
+        if before_usage is not None:
+            report = get_memory_report(before_usage, df.memory_usage(deep=True))
+            logger.debug("Deliveries memory usage (MB):\n%s", report.to_string())
+        
+        if write_snapshot(df, snapshot_path):
+            remove_stale_snapshots(data_version)
+    
+    # Tag the frame so indexes and caches can be keyed on the dataset version
+    df.attrs['data_version'] = data_version
+    df.attrs['data_rows'] = len(df)
+    
+    # Filter option lists are stored next to the snapshot
+    dimensions_path = get_snapshot_path(data_version, "_dimensions.json")
+    dimensions = read_json_snapshot(dimensions_path)
+    if dimensions is None:
+        dimensions = build_dimension_dictionary(df)
+        write_json_snapshot(dimensions, dimensions_path)
+    get_dimension_dictionary(df, data_version, dimensions)
+    
+    # So is the run expectancy table, which depends only on the dataset
+    run_expectancy_path = get_snapshot_path(data_version, "_run_expectancy.json")
+    records = read_json_snapshot(run_expectancy_path)
+    if records is None:
+        re_table, _ = calculate_run_expectancy_table(df)
+        records = run_expectancy_to_records(re_table)
+        write_json_snapshot(records, run_expectancy_path)
+    get_run_expectancy(df, data_version, run_expectancy_from_records(records))
     
-    # Preprocess data
-    df = preprocess_data(df)
+    # Build the row indexes once so the first page render doesn't pay for them
+    get_batter_index(df, data_version)
+    get_bitmap_index(df, data_version)
+    get_fixture_index(df, data_version)
+    get_batter_value_counts_index(df, data_version)
     
     return df
 
-def preprocess_data(df):
-    """Preprocess the dataframe"""
-    # Convert date columns
+def get_file_hash(path, chunk_size=1 << 20):
+    """Get the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def get_snapshot_path(data_version, suffix=".parquet"):
+    """Get the path of a snapshot file for a dataset version (CSV hash + preprocessing version)"""
+    return os.path.join(SNAPSHOT_DIR, f"wt20_{data_version}{suffix}")
+
+def read_snapshot(path):
+    """Read a preprocessed Parquet snapshot, or None if it is missing or unreadable"""
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_parquet(path)
+    except Exception:
+        # Missing pyarrow or a corrupt file - fall back to parsing the CSV
+        return None
+
+def write_replacing(path, write):
+    """
+    Call write(tmp_path) on a unique temp file next to path, then move it into
+    place, so concurrent writers never share a temp file and readers never see
+    a partial file. The temp file is removed if writing fails.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        # mkstemp creates the file 0600; keep snapshots readable by other users and replicas
+        os.chmod(tmp_path, SNAPSHOT_FILE_MODE)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def write_snapshot(df, path):
+    """Write a preprocessed Parquet snapshot (best effort), returning whether it succeeded"""
+    try:
+        write_replacing(path, lambda tmp_path: df.to_parquet(tmp_path, index=False))
+    except Exception:
+        # Read-only filesystem or missing pyarrow - the app still works without a snapshot
+        return False
+    return True
+
+def read_json_snapshot(path):
+    """Read a JSON file stored next to the snapshot, or None if missing or unreadable"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_json_snapshot(data, path):
+    """Write a JSON file next to the snapshot (best effort)"""
+    def write(tmp_path):
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+    
+    try:
+        write_replacing(path, write)
+    except (OSError, TypeError, ValueError):
+        pass
+
+def remove_stale_snapshots(data_version):
+    """Remove snapshot files written for other dataset versions"""
+    current_prefix = os.path.basename(get_snapshot_path(data_version, ""))
+    for old_path in glob.glob(os.path.join(SNAPSHOT_DIR, "wt20_*")):
+        if not os.path.basename(old_path).startswith(current_prefix):
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+def apply_dtype_plan(df, plan=DTYPE_PLAN):
+    """Convert columns to the compact dtypes declared in the plan"""
+    for col, dtype in plan.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        
+        if dtype == "category":
+            df[col] = df[col].astype("category")
+            continue
+        
+        values = pd.to_numeric(df[col], errors='coerce')
+        if np.issubdtype(np.dtype(dtype), np.integer):
+            # Integer downcast only when lossless, otherwise keep float32 for NaNs
+            info = np.iinfo(dtype)
+            if values.isna().any() or (values % 1 != 0).any():
+                dtype = "float32"
+            elif values.min() < info.min or values.max() > info.max:
+                continue
+        df[col] = values.astype(dtype)
+    
+    return df
+
+def get_memory_report(before_usage, after_usage):
+    """Get per-column memory usage in MB before and after applying the dtype plan"""
+    report = pd.DataFrame({
+        'Before': before_usage,
+        'After': after_usage
+    }).fillna(0) / (1024 * 1024)
+    report.loc['Total'] = report.sum()
+    report['Saved %'] = (1 - report['After'] / report['Before']) * 100
+    return report.round(2)
+
+# Value normalizations applied during preprocessing
+FOOT_NORMALIZATION = {'0': 'No Effective Movement', '0.0': 'No Effective Movement', 'NoMovement': 'No Effective Movement'}
+
+DISMISSAL_NORMALIZATION = {
+    'Caught': 'Caught Out',
+    'CaughtSub': 'Caught Out',
+    'RunOut': 'Run Out',
+    'RunOutSub': 'Run Out'
+}
+
+WICKET_TRUE_VALUES = [True, 1, 'True', '1', 'true']
+
+# Row order of the preprocessed frame
+DELIVERY_ORDER = ['fixtureId', 'inns', 'over', 'ball']
+
+def parse_match_dates(df):
+    """Convert the match date column to datetimes"""
     if 'matchDate' in df.columns:
         df['matchDate'] = pd.to_datetime(df['matchDate'], errors='coerce')
-    
-    # Filter ball column to only include 1-6
+    return df
+
+def filter_legal_balls(df):
+    """Keep only balls numbered 1-6 in an over"""
     if 'ball' in df.columns:
         df = df[df['ball'].isin([1, 2, 3, 4, 5, 6])]
-    
-    # Handle foot column - combine '0' and 'NoMovement' as 'No Effective Movement'
+    return df
+
+def sort_deliveries(df):
+    """Sort deliveries by fixture, innings, over and ball, with a contiguous index"""
+    sort_columns = [col for col in DELIVERY_ORDER if col in df.columns]
+    if sort_columns:
+        df = df.sort_values(sort_columns, kind='stable')
+    # Contiguous index so a snapshot round-trip gives back the same frame,
+    # and each fixture's deliveries form one contiguous row range
+    return df.reset_index(drop=True)
+
+def normalize_foot(df):
+    """Combine '0', '0.0' and 'NoMovement' as 'No Effective Movement'"""
     if 'foot' in df.columns:
-        df['foot'] = df['foot'].replace({'0': 'No Effective Movement', 'NoMovement': 'No Effective Movement'})
-    
-    # Handle dismissalType - combine 'Caught' and 'CaughtSub' as 'Caught Out'
+        df['foot'] = df['foot'].replace(FOOT_NORMALIZATION)
+    return df
+
+def normalize_dismissals(df):
+    """Combine spelling variants of caught and run out dismissals"""
+    if 'dismissalType' in df.columns:
+        df['dismissalType'] = df['dismissalType'].replace(DISMISSAL_NORMALIZATION)
+    return df
+
+def categorize_dismissals(df):
+    """Map dismissal spellings onto the standard DISMISSAL_KINDS categorical"""
     if 'dismissalType' in df.columns:
-        df['dismissalType'] = df['dismissalType'].replace({
-            'Caught': 'Caught Out', 
-            'CaughtSub': 'Caught Out',
-            'RunOut': 'Run Out',
-            'RunOutSub': 'Run Out'
-        })
-    
-    # Create 'with_control' column
+        kinds = df['dismissalType'].map(DISMISSAL_KIND_VARIANTS)
+        df['dismissal_kind'] = pd.Categorical(kinds, categories=DISMISSAL_KINDS)
+    return df
+
+def add_match_phase(df):
+    """Label each delivery with its phase of the innings (from the over bucket)"""
+    if 'over' in df.columns:
+        codes = get_over_bucket_codes(df['over'])
+        df['phase'] = pd.Categorical.from_codes(codes, categories=MATCH_PHASES)
+    return df
+
+def add_derived_flags(df):
+    """Add per-delivery control, aerial, boundary and dot flags"""
     if 'parsed_control' in df.columns:
         df['with_control'] = df['parsed_control'].isin(['under control', 'well timed'])
     
-    # Create 'is_aerial' column
     if 'elevation' in df.columns:
         df['is_aerial'] = df['elevation'] == 'in the air'
     
-    # Create 'is_boundary' column
     if 'runs_scored' in df.columns:
         df['is_boundary'] = df['runs_scored'].isin([4, 6])
         df['is_dot'] = df['runs_scored'] == 0
+    return df
+
+def parse_wickets(df):
+    """Create the 'is_out' flag from is_wicket and dismissalType"""
+    is_out = pd.Series(False, index=df.index)
     
-    # Create 'is_out' column - handle various formats
     if 'is_wicket' in df.columns:
-        # Handle string 'True'/'False', boolean, or 1/0
-        df['is_out'] = df['is_wicket'].apply(lambda x: 
-            x == True or x == 'True' or x == 1 or x == '1' or x == 'true'
-        )
+        # Handles string 'True'/'true'/'1', boolean and 1/0 in a single hash lookup
+        is_out = df['is_wicket'].isin(WICKET_TRUE_VALUES)
     
     # Also check dismissalType for outs
     if 'dismissalType' in df.columns:
-        df['is_out'] = df['is_out'] | df['dismissalType'].notna() & (df['dismissalType'] != '')
+        is_out = is_out | df['dismissalType'].notna() & (df['dismissalType'] != '')
+    
+    if 'is_wicket' in df.columns or 'dismissalType' in df.columns:
+        df['is_out'] = is_out
+    return df
+
+# Preprocessing stages, run in order by preprocess_data
+PREPROCESS_STAGES = [
+    ("parse dates", parse_match_dates),
+    ("filter legal balls", filter_legal_balls),
+    ("sort deliveries", sort_deliveries),
+    ("foot normalization", normalize_foot),
+    ("dismissal normalization", normalize_dismissals),
+    ("dismissal kinds", categorize_dismissals),
+    ("match phase", add_match_phase),
+    ("derived flags", add_derived_flags),
+    ("wicket parsing", parse_wickets),
+    ("innings context", add_innings_context)
+]
+
+def log_stage_timing(stage, seconds, rows):
+    """Default preprocessing hook - log each stage's duration at DEBUG level"""
+    logger.debug("preprocess %-24s %8.1f ms  %d rows", stage, seconds * 1000, rows)
+
+def preprocess_data(df, on_stage=log_stage_timing):
+    """
+    Preprocess the dataframe through the named PREPROCESS_STAGES.
+    on_stage(stage, seconds, rows) is called after each stage for timing.
+    """
+    for stage, func in PREPROCESS_STAGES:
+        start = time.perf_counter()
+        df = func(df)
+        if on_stage is not None:
+            on_stage(stage, time.perf_counter() - start, len(df))
     
     return df
 
-@st.cache_data
 def get_batters_list(_df):
     """Get sorted list of all batters"""
-    if _df is None or 'batsman' not in _df.columns:
-        return []
-    return sorted(_df['batsman'].dropna().unique().tolist())
+    return get_filter_options(_df, 'batsman')
 
-@st.cache_data
 def get_unique_values(_df, column):
     """Get unique values from a column"""
-    if _df is None or column not in _df.columns:
-        return []
-    return sorted(_df[column].dropna().unique().tolist())
+    return get_filter_options(_df, column)
 
 def get_batter_hand(df, batter):
     """Get the handedness of a batter"""
     if df is None or batter is None:
         return "Right"
-    batter_data = df[df['batsman'] == batter]
-    if len(batter_data) > 0 and 'batsmanHand' in batter_data.columns:
-        hand = batter_data['batsmanHand'].mode()
+    if 'batsmanHand' in df.columns:
+        hand = df['batsmanHand'].iloc[get_batter_rows(df, batter)].mode()
         if len(hand) > 0:
             return hand.iloc[0]
     return "Right"
@@ -98,30 +357,44 @@ def get_matches_for_batter_and_filters(df, batter, filters):
     if df is None:
         return []
     
-    filtered_df = df.copy()
+    fixture_ids = df['fixtureId']
     
-    # Apply batter filter
+    # Start from the rows of the batter's fixtures
     if batter:
-        batter_matches = df[df['batsman'] == batter]['fixtureId'].unique()
-        filtered_df = filtered_df[filtered_df['fixtureId'].isin(batter_matches)]
+        rows = get_fixture_rows(df, get_batter_fixtures(df, batter))
+    else:
+        rows = np.arange(len(df))
     
     # Apply other filters
-    if filters.get('for_team') and 'All' not in filters['for_team']:
-        filtered_df = filtered_df[filtered_df['battingTeam'].isin(filters['for_team'])]
-    
-    if filters.get('opposition') and 'All' not in filters['opposition']:
-        filtered_df = filtered_df[filtered_df['bowlingTeam'].isin(filters['opposition'])]
+    bits = get_filter_bitmap(df, filters, MATCH_FILTER_KEYS)
+    if bits is not None:
+        rows = rows[test_bitmap(bits, rows)]
     
-    if filters.get('competition') and 'All' not in filters['competition']:
-        filtered_df = filtered_df[filtered_df['competition'].isin(filters['competition'])]
-    
-    if filters.get('venue') and 'All' not in filters['venue']:
-        filtered_df = filtered_df[filtered_df['ground'].isin(filters['venue'])]
-    
-    if filters.get('host_country') and 'All' not in filters['host_country']:
-        filtered_df = filtered_df[filtered_df['country'].isin(filters['host_country'])]
-    
-    if filters.get('innings') and 'All' not in filters['innings']:
-        filtered_df = filtered_df[filtered_df['inns'].isin(filters['innings'])]
+    return fixture_ids.iloc[rows].unique().tolist()
+
+def get_matches_frame(df, match_ids):
+    """Get all deliveries in the given fixtures, in frame order"""
+    if df is None:
+        return None
+    return df.iloc[get_fixture_rows(df, match_ids)]
+
+@st.cache_resource(max_entries=FILTER_CACHE_SIZE)
+def get_cached_baseline_data(_df, _filters, data_version, batter, filter_key):
+    """LRU cache of baseline match IDs and frames, keyed on the normalized filters"""
+    FILTER_CACHE_STATS['baseline']['misses'] += 1
+    match_ids = get_matches_for_batter_and_filters(_df, batter, _filters)
+    return match_ids, get_matches_frame(_df, match_ids)
+
+def get_baseline_data(df, batter, filters):
+    """
+    Get the "average batter" match IDs and their deliveries for a batter and filters.
+    The returned frame is shared between reruns and pages, so treat it as read-only.
+    """
+    data_version = get_data_version(df)
+    if data_version is None:
+        match_ids = get_matches_for_batter_and_filters(df, batter, filters)
+        return match_ids, get_matches_frame(df, match_ids)
     
-    return filtered_df['fixtureId'].unique().tolist()
+    FILTER_CACHE_STATS['baseline']['lookups'] += 1
+    filter_key = get_filter_key(df, filters, MATCH_FILTER_KEYS)
+    return get_cached_baseline_data(df, filters, data_version, batter, filter_key)
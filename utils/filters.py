@@ -1,78 +1,164 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime
-from config.settings import MIN_DATE, MAX_DATE
+from config.settings import MIN_DATE, MAX_DATE, MULTISELECT_FILTER_COLUMNS, FILTER_CACHE_SIZE, SCORING_AREA_SECTOR_OPTIONS
+from utils.indexes import get_data_version, get_batter_rows, get_filter_options, get_batter_value_counts, get_value_bitmap, test_bitmap, unpack_bitmap
 
-def apply_filters(df, batter, filters):
-    """Apply all filters to the dataframe"""
-    if df is None:
+def get_active_filter_values(filters, key):
+    """Get the selected values for a multiselect filter, or None if it is unset or 'All'"""
+    values = filters.get(key)
+    if not values or 'All' in values:
         return None
-    
-    filtered_df = df.copy()
-    
-    # Apply batter filter
-    if batter:
-        filtered_df = filtered_df[filtered_df['batsman'] == batter]
-    
-    # Apply team filter
-    if filters.get('for_team') and 'All' not in filters['for_team']:
-        filtered_df = filtered_df[filtered_df['battingTeam'].isin(filters['for_team'])]
-    
-    # Apply opposition filter
-    if filters.get('opposition') and 'All' not in filters['opposition']:
-        filtered_df = filtered_df[filtered_df['bowlingTeam'].isin(filters['opposition'])]
-    
-    # Apply competition filter
-    if filters.get('competition') and 'All' not in filters['competition']:
-        filtered_df = filtered_df[filtered_df['competition'].isin(filters['competition'])]
-    
-    # Apply venue filter
-    if filters.get('venue') and 'All' not in filters['venue']:
-        filtered_df = filtered_df[filtered_df['ground'].isin(filters['venue'])]
-    
-    # Apply host country filter
-    if filters.get('host_country') and 'All' not in filters['host_country']:
-        filtered_df = filtered_df[filtered_df['country'].isin(filters['host_country'])]
+    return values
+
+def get_filter_bitmap(df, filters, keys=MULTISELECT_FILTER_COLUMNS):
+    """
+    Combine the multiselect filters into one packed row bitmap.
+    Values within a filter are OR-ed, filters are AND-ed.
+    Returns None if none of the given filters is active.
+    """
+    bits = None
+    for key in keys:
+        values = get_active_filter_values(filters, key)
+        if values is None:
+            continue
+        value_bits = get_value_bitmap(df, MULTISELECT_FILTER_COLUMNS[key], values)
+        bits = value_bits if bits is None else bits & value_bits
+    return bits
+
+def build_filter_mask(df, filters, rows=None):
+    """
+    Build a single boolean mask for all filters.
+    If rows is given, the mask covers only those row positions.
+    """
+    def column(name):
+        return df[name] if rows is None else df[name].iloc[rows]
+    
+    # Apply team, opposition, competition, venue, country, bowler and innings filters
+    bits = get_filter_bitmap(df, filters)
+    if bits is None:
+        mask = np.ones(len(df) if rows is None else len(rows), dtype=bool)
+    elif rows is None:
+        mask = unpack_bitmap(bits, len(df))
+    else:
+        mask = test_bitmap(bits, rows)
     
     # Apply overs filter
     if filters.get('overs'):
         over_min, over_max = filters['overs']
-        filtered_df = filtered_df[(filtered_df['over'] >= over_min) & (filtered_df['over'] <= over_max)]
-    
-    # Apply bowler type filter
-    if filters.get('bowler_type') and 'All' not in filters['bowler_type']:
-        filtered_df = filtered_df[filtered_df['bowlerType'].isin(filters['bowler_type'])]
-    
-    # Apply specific bowler filter
-    if filters.get('against_bowler') and 'All' not in filters['against_bowler']:
-        filtered_df = filtered_df[filtered_df['bowler'].isin(filters['against_bowler'])]
-    
-    # Apply innings filter
-    if filters.get('innings') and 'All' not in filters['innings']:
-        filtered_df = filtered_df[filtered_df['inns'].isin(filters['innings'])]
+        overs = column('over').to_numpy()
+        mask &= (overs >= over_min) & (overs <= over_max)
     
     # Apply date filter
-    if filters.get('date_range'):
+    if filters.get('date_range') and 'matchDate' in df.columns:
         start_date, end_date = filters['date_range']
-        if 'matchDate' in filtered_df.columns:
-            filtered_df = filtered_df[
-                (filtered_df['matchDate'] >= pd.Timestamp(start_date)) & 
-                (filtered_df['matchDate'] <= pd.Timestamp(end_date))
-            ]
+        dates = column('matchDate')
+        mask &= ((dates >= pd.Timestamp(start_date)) & (dates <= pd.Timestamp(end_date))).to_numpy()
     
-    # Apply bowler hand filter
-    if filters.get('bowler_hand') and 'All' not in filters['bowler_hand']:
-        filtered_df = filtered_df[filtered_df['bowlerHand'].isin(filters['bowler_hand'])]
+    return mask
+
+def apply_filters(df, batter, filters):
+    """Apply all filters to the dataframe"""
+    if df is None:
+        return None
     
-    # Apply bowling angle filter
-    if filters.get('bowling_angle') and 'All' not in filters['bowling_angle']:
-        filtered_df = filtered_df[filtered_df['bowlingAngle'].isin(filters['bowling_angle'])]
+    # Start from the batter's rows instead of scanning the full table
+    if batter:
+        rows = get_batter_rows(df, batter)
+        mask = build_filter_mask(df, filters, rows)
+        return df.iloc[rows[mask]]
     
-    return filtered_df
+    return df[build_filter_mask(df, filters)]
+
+# Lookup and miss counts for the filter caches (hits = lookups - misses)
+FILTER_CACHE_STATS = {
+    'filtered': {'lookups': 0, 'misses': 0},
+    'baseline': {'lookups': 0, 'misses': 0}
+}
+
+def get_filter_cache_stats():
+    """Get hit/miss counts for the filtered-slice and baseline caches"""
+    return {
+        name: {'hits': counts['lookups'] - counts['misses'], 'misses': counts['misses']}
+        for name, counts in FILTER_CACHE_STATS.items()
+    }
+
+@st.cache_resource
+def get_filter_bounds(_df, data_version):
+    """Full over and date ranges of the dataset, used to recognise no-op range filters"""
+    bounds = {}
+    if 'over' in _df.columns and len(_df) > 0 and _df['over'].notna().all():
+        bounds['overs'] = (_df['over'].min(), _df['over'].max())
+    if 'matchDate' in _df.columns and len(_df) > 0 and _df['matchDate'].notna().all():
+        bounds['date_range'] = (_df['matchDate'].min(), _df['matchDate'].max())
+    return bounds
+
+def get_active_overs(df, filters):
+    """Get the (min, max) overs filter, or None if it is unset or covers every over in the dataset"""
+    overs = filters.get('overs')
+    if not overs:
+        return None
+    over_min, over_max = overs
+    data_version = get_data_version(df)
+    full = get_filter_bounds(df, data_version).get('overs') if data_version is not None else None
+    if full and over_min <= full[0] and over_max >= full[1]:
+        return None
+    return (int(over_min), int(over_max))
+
+def get_filter_key(df, filters, keys=None):
+    """
+    Get a canonical, hashable key for a filter dict.
+    Unset, empty and 'All' multiselects map to None and selected values are sorted.
+    Ranges covering the whole dataset map to None, dates become ordinal days.
+    Only keys that change the filtered rows are included.
+    """
+    data_version = get_data_version(df)
+    bounds = get_filter_bounds(df, data_version) if data_version is not None else {}
+    
+    key = []
+    for name in MULTISELECT_FILTER_COLUMNS:
+        if keys is None or name in keys:
+            values = get_active_filter_values(filters, name)
+            key.append((name, None if values is None else tuple(sorted(set(values), key=str))))
+    
+    if keys is None or 'overs' in keys:
+        key.append(('overs', get_active_overs(df, filters)))
+    
+    if keys is None or 'date_range' in keys:
+        date_range = filters.get('date_range')
+        if date_range:
+            start_date, end_date = date_range
+            full = bounds.get('date_range')
+            if full and pd.Timestamp(start_date) <= full[0] and pd.Timestamp(end_date) >= full[1]:
+                date_range = None
+            else:
+                date_range = (start_date.toordinal(), end_date.toordinal())
+        key.append(('date_range', date_range or None))
+    
+    return tuple(key)
+
+@st.cache_resource(max_entries=FILTER_CACHE_SIZE)
+def get_cached_filtered_data(_df, _filters, data_version, batter, filter_key):
+    """LRU cache of apply_filters results, keyed on the normalized filters"""
+    FILTER_CACHE_STATS['filtered']['misses'] += 1
+    return apply_filters(_df, batter, _filters)
+
+def get_filtered_data(df, batter, filters):
+    """
+    Cached apply_filters.
+    The returned frame is shared between reruns and pages, so treat it as read-only.
+    """
+    data_version = get_data_version(df)
+    if data_version is None:
+        return apply_filters(df, batter, filters)
+    
+    FILTER_CACHE_STATS['filtered']['lookups'] += 1
+    return get_cached_filtered_data(df, filters, data_version, batter, get_filter_key(df, filters))
 
 def create_batter_selector(df, key_prefix=""):
     """Create batter selection dropdown with session state preservation"""
-    batters = sorted(df['batsman'].dropna().unique().tolist()) if df is not None else []
+    batters = get_filter_options(df, 'batsman')
     
     # Get default from session state if available
     default_index = 0
@@ -89,8 +175,54 @@ def create_batter_selector(df, key_prefix=""):
     
     return selected_batter if selected_batter else None
 
-def create_filter_widgets(df, page_type="default", key_prefix=""):
-    """Create filter widgets based on page type"""
+def get_option_counts(df, batter, column, filters):
+    """
+    Count each value of a column over the batter's deliveries that pass the given filters.
+    Uses the precomputed per-batter counts when no filter is active yet
+    (a full-range overs slider counts as inactive).
+    """
+    bits = get_filter_bitmap(df, filters)
+    overs = get_active_overs(df, filters)
+    if bits is None and overs is None:
+        return get_batter_value_counts(df, batter).get(column, {})
+    
+    rows = get_batter_rows(df, batter)
+    if bits is not None:
+        rows = rows[test_bitmap(bits, rows)]
+    if overs is not None:
+        over_values = df['over'].iloc[rows].to_numpy()
+        rows = rows[(over_values >= overs[0]) & (over_values <= overs[1])]
+    
+    counts = df[column].iloc[rows].value_counts()
+    return {value: int(count) for value, count in counts.items() if count > 0}
+
+def get_cascading_options(df, batter, filters, key, widget_key):
+    """
+    Get the options and label formatter for a multiselect filter.
+    With a batter selected, options are narrowed to values the batter faced under the
+    filters chosen above this one, and each label shows its delivery count.
+    """
+    column = MULTISELECT_FILTER_COLUMNS[key]
+    options = get_filter_options(df, column)
+    if not batter or column not in df.columns:
+        return options, str
+    
+    counts = get_option_counts(df, batter, column, filters)
+    
+    # Keep current selections listed so the widget state stays valid
+    selected = set(st.session_state.get(widget_key, []))
+    options = [option for option in options if option in counts or option in selected]
+    
+    def format_option(option):
+        return f"{option} ({counts.get(option, 0):,})"
+    
+    return options, format_option
+
+def create_filter_widgets(df, page_type="default", key_prefix="", batter=None):
+    """
+    Create filter widgets based on page type.
+    If a batter is given, option lists cascade from the batter and earlier filters.
+    """
     filters = {}
     
     if df is None:
@@ -99,10 +231,11 @@ def create_filter_widgets(df, page_type="default", key_prefix=""):
     st.markdown("### Filters")
     
     # For Team filter
-    teams = sorted(df['battingTeam'].dropna().unique().tolist())
+    teams, format_option = get_cascading_options(df, batter, filters, 'for_team', f"{key_prefix}_for_team")
     filters['for_team'] = st.multiselect(
         "For Team",
         options=teams,
+        format_func=format_option,
         default=[],
         key=f"{key_prefix}_for_team",
         help="Select batting team(s)"
@@ -111,10 +244,11 @@ def create_filter_widgets(df, page_type="default", key_prefix=""):
         filters['for_team'] = ['All']
     
     # Opposition filter
-    oppositions = sorted(df['bowlingTeam'].dropna().unique().tolist())
+    oppositions, format_option = get_cascading_options(df, batter, filters, 'opposition', f"{key_prefix}_opposition")
     filters['opposition'] = st.multiselect(
         "Opposition",
         options=oppositions,
+        format_func=format_option,
         default=[],
         key=f"{key_prefix}_opposition",
         help="Select opposition team(s)"
@@ -123,10 +257,11 @@ def create_filter_widgets(df, page_type="default", key_prefix=""):
         filters['opposition'] = ['All']
     
     # Competition filter
-    competitions = sorted(df['competition'].dropna().unique().tolist())
+    competitions, format_option = get_cascading_options(df, batter, filters, 'competition', f"{key_prefix}_competition")
     filters['competition'] = st.multiselect(
         "Competition",
         options=competitions,
+        format_func=format_option,
         default=[],
         key=f"{key_prefix}_competition",
         help="Select competition(s)"
@@ -135,10 +270,11 @@ def create_filter_widgets(df, page_type="default", key_prefix=""):
         filters['competition'] = ['All']
     
     # Venue filter
-    venues = sorted(df['ground'].dropna().unique().tolist())
+    venues, format_option = get_cascading_options(df, batter, filters, 'venue', f"{key_prefix}_venue")
     filters['venue'] = st.multiselect(
         "Venue",
         options=venues,
+        format_func=format_option,
         default=[],
         key=f"{key_prefix}_venue",
         help="Select venue(s)"
@@ -147,10 +283,11 @@ def create_filter_widgets(df, page_type="default", key_prefix=""):
         filters['venue'] = ['All']
     
     # Host Country filter
-    countries = sorted(df['country'].dropna().unique().tolist())
+    countries, format_option = get_cascading_options(df, batter, filters, 'host_country', f"{key_prefix}_host_country")
     filters['host_country'] = st.multiselect(
         "Host Country",
         options=countries,
+        format_func=format_option,
         default=[],
         key=f"{key_prefix}_host_country",
         help="Select host country(ies)"
@@ -173,10 +310,11 @@ def create_filter_widgets(df, page_type="default", key_prefix=""):
     # Against Bowler Type filter - for specific pages
     if page_type in ["default", "line_length", "shots_analysis", "shot_areas", 
                       "innings_progression", "feet_movement", "wagon_wheels"]:
-        bowler_types = sorted(df['bowlerType'].dropna().unique().tolist())
+        bowler_types, format_option = get_cascading_options(df, batter, filters, 'bowler_type', f"{key_prefix}_bowler_type")
         filters['bowler_type'] = st.multiselect(
             "Against Bowler Type",
             options=bowler_types,
+            format_func=format_option,
             default=[],
             key=f"{key_prefix}_bowler_type",
             help="Select bowler type(s)"
@@ -187,10 +325,11 @@ def create_filter_widgets(df, page_type="default", key_prefix=""):
     # Against Bowler filter - for specific pages
     if page_type in ["default", "line_length", "shots_analysis", "shot_areas", 
                       "innings_progression", "feet_movement", "wagon_wheels"]:
-        bowlers = sorted(df['bowler'].dropna().unique().tolist())
+        bowlers, format_option = get_cascading_options(df, batter, filters, 'against_bowler', f"{key_prefix}_against_bowler")
         filters['against_bowler'] = st.multiselect(
             "Against Bowler",
             options=bowlers,
+            format_func=format_option,
             default=[],
             key=f"{key_prefix}_against_bowler",
             help="Select specific bowler(s)"
@@ -200,10 +339,11 @@ def create_filter_widgets(df, page_type="default", key_prefix=""):
     
     # Bowler Hand filter - for ball_type page
     if page_type == "ball_type":
-        bowler_hands = sorted(df['bowlerHand'].dropna().unique().tolist())
+        bowler_hands, format_option = get_cascading_options(df, batter, filters, 'bowler_hand', f"{key_prefix}_bowler_hand")
         filters['bowler_hand'] = st.multiselect(
             "Against Bowling Hand",
             options=bowler_hands,
+            format_func=format_option,
             default=[],
             key=f"{key_prefix}_bowler_hand",
             help="Select bowler hand(s)"
@@ -211,10 +351,11 @@ def create_filter_widgets(df, page_type="default", key_prefix=""):
         if not filters['bowler_hand']:
             filters['bowler_hand'] = ['All']
         
-        bowling_angles = sorted(df['bowlingAngle'].dropna().unique().tolist())
+        bowling_angles, format_option = get_cascading_options(df, batter, filters, 'bowling_angle', f"{key_prefix}_bowling_angle")
         filters['bowling_angle'] = st.multiselect(
             "Against Bowling Angle",
             options=bowling_angles,
+            format_func=format_option,
             default=[],
             key=f"{key_prefix}_bowling_angle",
             help="Select bowling angle(s)"
@@ -223,10 +364,11 @@ def create_filter_widgets(df, page_type="default", key_prefix=""):
             filters['bowling_angle'] = ['All']
     
     # Innings filter
-    innings_options = sorted(df['inns'].dropna().unique().tolist())
+    innings_options, format_option = get_cascading_options(df, batter, filters, 'innings', f"{key_prefix}_innings")
     filters['innings'] = st.multiselect(
         "Innings",
         options=innings_options,
+        format_func=format_option,
         default=[],
         key=f"{key_prefix}_innings",
         help="Select innings"
@@ -270,5 +412,46 @@ def create_filter_widgets(df, page_type="default", key_prefix=""):
             key=f"{key_prefix}_rolling_window",
             help="Select rolling window range for balls faced"
         )
+        filters['smoothing_window'] = st.slider(
+            "Smoothing window (balls)",
+            min_value=1,
+            max_value=15,
+            value=1,
+            key=f"{key_prefix}_smoothing_window",
+            help="Average each ball number over this many balls faced (1 = no smoothing)"
+        )
+        filters['smoothing_centered'] = st.checkbox(
+            "Center smoothing window",
+            value=False,
+            key=f"{key_prefix}_smoothing_centered",
+            help="Center the window on each ball instead of trailing it"
+        )
+    
+    # Wheel style and Scoring Areas wheel zones - for wagon_wheels page only
+    if page_type == "wagon_wheels":
+        st.markdown("**Wagon Wheel Style**")
+        filters['wheel_style'] = st.radio(
+            "Style",
+            options=["Static", "Interactive"],
+            index=0,
+            horizontal=True,
+            key=f"{key_prefix}_wheel_style",
+            help="Interactive draws every shot in the browser with hover details and legend toggles"
+        )
+        st.markdown("**Scoring Areas**")
+        filters['scoring_sectors'] = st.radio(
+            "Sectors",
+            options=SCORING_AREA_SECTOR_OPTIONS,
+            index=0,
+            horizontal=True,
+            key=f"{key_prefix}_scoring_sectors",
+            help="Number of equal sectors the ground is divided into"
+        )
+        filters['scoring_ring_split'] = st.checkbox(
+            "Split by distance",
+            value=False,
+            key=f"{key_prefix}_scoring_ring_split",
+            help="Split each sector into an inner and outer ring by shot distance"
+        )
     
     return filters
\ No newline at end of file
@@ -0,0 +1,233 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from config.settings import MULTISELECT_FILTER_COLUMNS
+
+def get_data_version(df):
+    """
+    Get the dataset version tag set by load_data, or None for ad-hoc frames.
+    Slices inherit attrs from the full frame, so the row count is checked too.
+    """
+    if df is None or df.attrs.get('data_rows') != len(df):
+        return None
+    return df.attrs.get('data_version')
+
+def build_batter_index(df):
+    """Map each batter to the sorted row positions of their deliveries"""
+    if df is None or 'batsman' not in df.columns:
+        return {}
+    return df.groupby('batsman', observed=True, sort=False).indices
+
+@st.cache_resource
+def get_batter_index(_df, data_version):
+    """Batter index shared across reruns, built once per dataset version"""
+    return build_batter_index(_df)
+
+def get_batter_rows(df, batter):
+    """Get the row positions of a batter's deliveries"""
+    data_version = get_data_version(df)
+    if data_version is None:
+        index = build_batter_index(df)
+    else:
+        index = get_batter_index(df, data_version)
+    return index.get(batter, np.empty(0, dtype=np.intp))
+
+# Columns with at most this many values keep one packed bitmap per value;
+# beyond it the bitmaps outgrow a single array of int32 row positions
+BITMAP_MAX_VALUES = 32
+
+def build_bitmap_index(df, columns=MULTISELECT_FILTER_COLUMNS.values()):
+    """
+    Build the row index behind the multiselect filters.
+    Low-cardinality columns get a packed row bitmap (np.packbits) per value,
+    len(df) / 8 bytes each. Higher-cardinality columns keep every row position
+    once, grouped by value with one stable argsort, and a bitmap is only packed
+    for the values a filter selects (see get_value_bitmap).
+    """
+    index = {}
+    if df is None:
+        return index
+    
+    for col in columns:
+        if col not in df.columns:
+            continue
+        codes, uniques = pd.factorize(df[col])
+        values = uniques.tolist()
+        if len(values) <= BITMAP_MAX_VALUES:
+            index[col] = {
+                'bitmaps': {value: np.packbits(codes == code) for code, value in enumerate(values)}
+            }
+        else:
+            # Row positions ordered by value code (ascending within a value);
+            # missing values (code -1) sort first and are skipped by the offsets
+            order = np.argsort(codes, kind='stable').astype(np.int32)
+            counts = np.bincount(codes[codes >= 0], minlength=len(values))
+            offsets = np.r_[0, np.cumsum(counts)] + np.count_nonzero(codes < 0)
+            index[col] = {
+                'codes': {value: code for code, value in enumerate(values)},
+                'rows': order,
+                'offsets': offsets
+            }
+    return index
+
+@st.cache_resource
+def get_bitmap_index(_df, data_version):
+    """Bitmap index shared across reruns, built once per dataset version"""
+    return build_bitmap_index(_df)
+
+def get_value_bitmap(df, column, values):
+    """Get the packed bitmap of rows whose column value is any of the given values"""
+    data_version = get_data_version(df)
+    column_index = get_bitmap_index(df, data_version).get(column) if data_version is not None else None
+    
+    if column_index is None:
+        # Ad-hoc frame without an index - build the bitmap directly
+        return np.packbits(df[column].isin(values).to_numpy())
+    
+    if 'bitmaps' in column_index:
+        bits = np.zeros((len(df) + 7) // 8, dtype=np.uint8)
+        for value in values:
+            value_bits = column_index['bitmaps'].get(value)
+            if value_bits is not None:
+                bits |= value_bits
+        return bits
+    
+    # Pack only the selected values' row positions
+    mask = np.zeros(len(df), dtype=bool)
+    rows, offsets = column_index['rows'], column_index['offsets']
+    for value in values:
+        code = column_index['codes'].get(value)
+        if code is not None:
+            mask[rows[offsets[code]:offsets[code + 1]]] = True
+    return np.packbits(mask)
+
+def unpack_bitmap(bits, n_rows):
+    """Expand a packed bitmap into a boolean mask over all rows"""
+    return np.unpackbits(bits, count=n_rows).view(bool)
+
+def test_bitmap(bits, rows):
+    """Get a boolean mask of which row positions are set in a packed bitmap"""
+    rows = np.asarray(rows)
+    return ((bits[rows >> 3] >> (7 - (rows & 7))) & 1).astype(bool)
+
+def build_fixture_index(df, batter_index):
+    """
+    Build the fixture -> row range layout and the batter -> fixtures map.
+    Needs rows sorted by fixtureId (see preprocess_data); returns None otherwise.
+    """
+    if df is None or 'fixtureId' not in df.columns:
+        return None
+    
+    fixture_ids = df['fixtureId'].to_numpy()
+    if np.any(fixture_ids[1:] < fixture_ids[:-1]):
+        return None
+    
+    starts = np.flatnonzero(np.r_[True, fixture_ids[1:] != fixture_ids[:-1]])
+    return {
+        'fixtures': fixture_ids[starts],
+        'starts': starts,
+        'stops': np.r_[starts[1:], len(fixture_ids)],
+        'batter_fixtures': {
+            batter: np.unique(fixture_ids[rows])
+            for batter, rows in batter_index.items()
+        }
+    }
+
+@st.cache_resource
+def get_fixture_index(_df, data_version):
+    """Fixture index shared across reruns, built once per dataset version"""
+    return build_fixture_index(_df, get_batter_index(_df, data_version))
+
+def get_batter_fixtures(df, batter):
+    """Get the fixture IDs of the matches a batter batted in"""
+    data_version = get_data_version(df)
+    fixture_index = get_fixture_index(df, data_version) if data_version is not None else None
+    if fixture_index is None:
+        return df['fixtureId'].iloc[get_batter_rows(df, batter)].unique()
+    return fixture_index['batter_fixtures'].get(batter, np.empty(0, dtype=fixture_index['fixtures'].dtype))
+
+def get_fixture_rows(df, fixture_ids):
+    """Get the row positions of all deliveries in the given fixtures, in frame order"""
+    data_version = get_data_version(df)
+    fixture_index = get_fixture_index(df, data_version) if data_version is not None else None
+    if fixture_index is None:
+        return np.flatnonzero(df['fixtureId'].isin(fixture_ids).to_numpy())
+    
+    # Look up each fixture's contiguous row range
+    fixtures = fixture_index['fixtures']
+    wanted = np.asarray(fixture_ids)
+    positions = np.searchsorted(fixtures, wanted)
+    found = positions < len(fixtures)
+    found[found] = fixtures[positions[found]] == wanted[found]
+    positions = np.unique(positions[found])
+    if len(positions) == 0:
+        return np.empty(0, dtype=np.intp)
+    
+    # Concatenate the ranges without a Python loop
+    starts = fixture_index['starts'][positions]
+    lengths = fixture_index['stops'][positions] - starts
+    offsets = np.repeat(starts - np.r_[0, np.cumsum(lengths)[:-1]], lengths)
+    return offsets + np.arange(lengths.sum())
+
+def build_dimension_dictionary(df):
+    """Get the sorted option list for the batter selector and every filter column"""
+    dimensions = {}
+    if df is None:
+        return dimensions
+    
+    for col in ['batsman'] + list(MULTISELECT_FILTER_COLUMNS.values()):
+        if col in df.columns:
+            dimensions[col] = sorted(df[col].dropna().unique().tolist())
+    return dimensions
+
+@st.cache_resource
+def get_dimension_dictionary(_df, data_version, _dimensions=None):
+    """
+    Option lists shared across reruns, built once per dataset version.
+    load_data seeds this with the lists persisted next to the snapshot.
+    """
+    if _dimensions is not None:
+        return _dimensions
+    return build_dimension_dictionary(_df)
+
+def get_filter_options(df, column):
+    """Get the sorted distinct values of a column for a sidebar widget"""
+    if df is None:
+        return []
+    
+    data_version = get_data_version(df)
+    if data_version is not None:
+        options = get_dimension_dictionary(df, data_version).get(column)
+        if options is not None:
+            return options
+    
+    if column not in df.columns:
+        return []
+    return sorted(df[column].dropna().unique().tolist())
+
+def build_batter_value_counts(df, columns=MULTISELECT_FILTER_COLUMNS.values()):
+    """Count the deliveries each batter faced for every value of each filter column"""
+    value_counts = {}
+    if df is None or 'batsman' not in df.columns:
+        return value_counts
+    
+    for col in columns:
+        if col not in df.columns:
+            continue
+        sizes = df.groupby(['batsman', col], observed=True, sort=False).size()
+        for (batter, value), count in sizes.items():
+            if count > 0:
+                value_counts.setdefault(batter, {}).setdefault(col, {})[value] = int(count)
+    return value_counts
+
+@st.cache_resource
+def get_batter_value_counts_index(_df, data_version):
+    """Per-batter value counts shared across reruns, built once per dataset version"""
+    return build_batter_value_counts(_df)
+
+def get_batter_value_counts(df, batter):
+    """Get {column: {value: deliveries}} for a batter"""
+    data_version = get_data_version(df)
+    if data_version is None:
+        return build_batter_value_counts(df.iloc[get_batter_rows(df, batter)]).get(batter, {})
+    return get_batter_value_counts_index(df, data_version).get(batter, {})